@@ -5,7 +5,9 @@ from .views import (
     AdminUserListView, 
     AdminUserCreateView, 
     AdminUserDeleteView, 
-    admin_seed_stocks
+    admin_seed_stocks,
+    admin_ingest_job,
+    admin_metrics
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
@@ -20,4 +22,6 @@ urlpatterns = [
     path('admin/users/create/', AdminUserCreateView.as_view(), name='admin_create_user'),
     path('admin/users/<int:pk>/', AdminUserDeleteView.as_view(), name='admin_delete_user'),
     path('admin/seed-stocks/', admin_seed_stocks, name='admin_seed_stocks'),
+    path('admin/seed-stocks/jobs/<int:job_id>/', admin_ingest_job, name='admin_ingest_job'),
+    path('admin/metrics/', admin_metrics, name='admin_metrics'),
 ]
@@ -7,7 +7,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import RegisterSerializer, AdminLoginSerializer, UserSerializer, AdminUserCreateSerializer
 from .models import Admin
-from stock_scraper.models import StockOHLC
+from stock_scraper.csv_parsing import COLUMN_MAPPING, REQUIRED_COLUMNS
+from stock_scraper.jobs import job_progress, queue_ingest_job
+from stock_scraper.models import IngestJob
+from backend import metrics
+from backend.pagination import KeysetPagination
+from django.http import HttpResponse
 import pandas as pd
 import os
 from django.core.files.storage import default_storage
@@ -62,6 +67,8 @@ class AdminLoginView(generics.GenericAPIView):
 class AdminUserListView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    # Users page by primary key
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         # Check if user is admin
@@ -124,82 +131,65 @@ def admin_seed_stocks(request):
         return Response({'error': 'Stock title is required'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        import pandas as pd
-        from stock_scraper.models import StockOHLC
-        df = pd.read_csv(csv_file)
-        column_mapping = {
-            'Date': 'date',
-            'date': 'date',
-            'Open': 'open',
-            'open': 'open',
-            'High': 'high',
-            'high': 'high',
-            'Low': 'low',
-            'low': 'low',
-            'Close': 'close',
-            'close': 'close',
-            'Volume': 'volume',
-            'volume': 'volume'
-        }
-        df = df.rename(columns=column_mapping)
-        required_columns = ['date', 'open', 'high', 'low', 'close', 'volume']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        # Reject files without the required columns before queueing them
+        header = pd.read_csv(csv_file, nrows=0).rename(columns=COLUMN_MAPPING)
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header.columns]
         if missing_columns:
             return Response({'error': f'Missing columns: {missing_columns}'}, status=status.HTTP_400_BAD_REQUEST)
-        symbol = stock_title.lower()
-        # Delete all existing records for this symbol
-        deleted_count, _ = StockOHLC.objects.filter(symbol=symbol).delete()
-        records_created = 0
-        errors = []
-        attempted = 0
-        for idx, row in df.iterrows():
-            attempted += 1
-            try:
-                # Clean volume field
-                volume_str = str(row['volume']).replace(',', '').strip()
-                volume_val = int(float(volume_str)) if volume_str else 0
-
-                date_value = row['date']
-                if isinstance(date_value, str):
-                    try:
-                        parsed_date = pd.to_datetime(date_value, format='%m/%d/%Y').date()
-                    except:
-                        parsed_date = pd.to_datetime(date_value).date()
-                else:
-                    parsed_date = pd.to_datetime(date_value).date()
-                StockOHLC.objects.create(
-                    symbol=symbol,
-                    date=parsed_date,
-                    open=float(row['open']),
-                    high=float(row['high']),
-                    low=float(row['low']),
-                    close=float(row['close']),
-                    volume=volume_val,
-                    percent=0.0
-                )
-                records_created += 1
-            except Exception as e:
-                error_msg = f'Row {idx}: {str(e)} | Data: {row.to_dict()}'
-                print(error_msg)
-                errors.append(error_msg)
-                continue
-        if attempted == 0:
-            return Response({'error': 'No rows found in CSV.'}, status=status.HTTP_400_BAD_REQUEST)
-        if records_created == 0:
-            return Response({
-                'error': f'No new records added for {symbol}. All rows failed to insert.',
-                'deleted_count': deleted_count,
-                'errors': errors
-            }, status=status.HTTP_400_BAD_REQUEST)
+        csv_file.seek(0)
+
+        job = queue_ingest_job(stock_title.lower(), csv_file, user=request.user)
         return Response({
-            'message': f'Successfully deleted {deleted_count} old records and added {records_created} new records for {symbol}.',
-            'deleted_count': deleted_count,
-            'records_created': records_created,
-            'errors': errors
-        }, status=status.HTTP_201_CREATED)
+            'message': f'Upload queued as ingest job {job.id}.',
+            'job_id': job.id,
+            'status': job.status,
+        }, status=status.HTTP_202_ACCEPTED)
     except Exception as e:
         import traceback
         print(f'Fatal error in admin_seed_stocks: {str(e)}')
         print(traceback.format_exc())
         return Response({'error': f'Error processing file: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_ingest_job(request, job_id):
+    # Check if user is admin
+    try:
+        admin = Admin.objects.get(user=request.user)
+    except Admin.DoesNotExist:
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        job = IngestJob.objects.get(pk=job_id)
+    except IngestJob.DoesNotExist:
+        return Response({'error': 'Ingest job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    data = {
+        'job_id': job.id,
+        'symbol': job.symbol,
+        'status': job.status,
+        'rows_processed': job.rows_processed,
+        'records_created': job.records_created,
+        'deleted_count': job.deleted_count,
+        'error_count': job.error_count,
+        'errors': job.errors,
+        'message': job.message,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+    data.update(job_progress(job) or {})
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_metrics(request):
+    # Check if user is admin
+    try:
+        admin = Admin.objects.get(user=request.user)
+    except Admin.DoesNotExist:
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
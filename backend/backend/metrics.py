@@ -0,0 +1,209 @@
+"""
+Process-local metrics in the Prometheus text exposition format.
+
+Nothing external is needed: counters and histograms live in memory and
+render() produces the text a Prometheus scraper expects. Each worker
+process keeps its own numbers, so scrape every worker (or run one) when
+the totals matter.
+
+    request_latency.observe(0.12, view='ma_crossover', method='GET')
+    observe_ingest('admin_upload', rows=5000, seconds=1.8)
+    register_cache('ohlc', ohlc_cache.stats)
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_lock = threading.Lock()
+_metrics = []
+_cache_providers = {}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        with _lock:
+            _metrics.append(self)
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+        with _lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f'{self.name}{_format_labels(key)} {_format_value(value)}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets):
+        super().__init__(name, description)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket counts (last one is +Inf), sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def _render_sample(self, key, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float('inf')), counts):
+            cumulative += count
+            labels = _format_labels(key + (('le', _format_value(bound)),))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(total)}')
+        lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+        return lines
+
+
+request_latency = Histogram(
+    'stockease_request_duration_seconds', 'Request latency by URL name.', LATENCY_BUCKETS
+)
+request_db_time = Histogram(
+    'stockease_request_db_seconds', 'Database time spent per request by URL name.', LATENCY_BUCKETS
+)
+request_queries = Counter(
+    'stockease_request_db_queries_total', 'SQL queries run by requests, by URL name.'
+)
+response_size = Histogram(
+    'stockease_response_size_bytes', 'Response body size by URL name.', SIZE_BUCKETS
+)
+requests_total = Counter(
+    'stockease_requests_total', 'Requests served by URL name and status code.'
+)
+ingest_rows = Counter(
+    'stockease_ingest_rows_total', 'OHLC rows written by each ingest path.'
+)
+ingest_seconds = Counter(
+    'stockease_ingest_seconds_total', 'Time spent in each ingest path.'
+)
+ingest_rate = Gauge(
+    'stockease_ingest_last_rows_per_second', 'Throughput of the most recent ingest per path.'
+)
+cache_lookups = Counter(
+    'stockease_cache_lookups_total', 'Lookups against caches without their own statistics.'
+)
+
+
+def observe_ingest(source, rows, seconds):
+    """
+    Record one ingest run of `rows` OHLC rows taking `seconds`
+    """
+    ingest_rows.inc(rows, source=source)
+    ingest_seconds.inc(seconds, source=source)
+    if seconds > 0:
+        ingest_rate.set(rows / seconds, source=source)
+
+
+def register_cache(name, stats):
+    """
+    Expose a cache whose `stats()` returns at least hits and misses
+    """
+    with _lock:
+        _cache_providers[name] = stats
+
+
+def _cache_lines():
+    with _lock:
+        providers = dict(_cache_providers)
+        lookups = dict(cache_lookups._values)
+
+    stats = {name: provider() for name, provider in providers.items()}
+    for key, count in lookups.items():
+        labels = dict(key)
+        entry = stats.setdefault(labels['cache'], {'hits': 0, 'misses': 0})
+        entry['hits' if labels['result'] == 'hit' else 'misses'] += count
+
+    lines = []
+    for field, kind, description in (
+        ('hits', 'counter', 'Cache hits.'),
+        ('misses', 'counter', 'Cache misses.'),
+        ('hit_ratio', 'gauge', 'Cache hits over lookups since start.'),
+        ('bytes', 'gauge', 'Bytes held by the cache.'),
+        ('entries', 'gauge', 'Entries held by the cache.'),
+        ('evictions', 'counter', 'Entries evicted from the cache.'),
+    ):
+        name = f'stockease_cache_{field}' + ('_total' if kind == 'counter' else '')
+        samples = []
+        for cache in sorted(stats):
+            entry = stats[cache]
+            if field == 'hit_ratio':
+                lookups_seen = entry['hits'] + entry['misses']
+                value = entry['hits'] / lookups_seen if lookups_seen else None
+            else:
+                value = entry.get(field)
+            if value is not None:
+                samples.append(f'{name}{_format_labels((("cache", cache),))} {_format_value(value)}')
+        if samples:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}', *samples]
+    return lines
+
+
+def render():
+    """
+    Every metric in the Prometheus text format
+    """
+    with _lock:
+        metrics = [metric for metric in _metrics if metric is not cache_lookups]
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+    lines += _cache_lines()
+    return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
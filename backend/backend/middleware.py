@@ -0,0 +1,136 @@
+"""
+Per-request SQL query accounting and request metrics.
+
+QueryBudgetMiddleware records every query a request runs (count, total DB
+time and repeated statements, the usual sign of an N+1 loop) and checks
+them against settings.QUERY_BUDGET:
+
+    QUERY_BUDGET = {
+        'MAX_QUERIES': 50,       # queries per request
+        'MAX_DUPLICATES': 5,     # runs of one statement per request
+        'ACTION': 'warn',        # 'warn' logs, 'raise' raises QueryBudgetExceeded
+        'HEADERS': True,         # add X-DB-* response headers
+    }
+
+'raise' is meant for the test settings, so regressions fail tests instead
+of reaching production.
+
+RequestMetricsMiddleware feeds backend.metrics (latency, DB time and
+response size per URL name). It goes before QueryBudgetMiddleware so the
+query recorder is on the request by the time it reads it.
+"""
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+from backend import metrics
+
+logger = logging.getLogger('stockease.queries')
+
+DEFAULT_QUERY_BUDGET = {
+    'MAX_QUERIES': 50,
+    'MAX_DUPLICATES': 5,
+    'ACTION': 'warn',
+    'HEADERS': False,
+}
+
+# Collapses "IN (%s, %s, %s)" of any length into one signature
+PLACEHOLDER_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_signature(sql):
+    return PLACEHOLDER_LIST.sub('%s, ...', sql)
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper hook collecting SQL signatures and timings
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.signatures[query_signature(sql)] += 1
+
+    def duplicates(self):
+        return {sql: runs for sql, runs in self.signatures.items() if runs > 1}
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budget = {**DEFAULT_QUERY_BUDGET, **getattr(settings, 'QUERY_BUDGET', {})}
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        request.db_queries = recorder
+
+        duplicates = recorder.duplicates()
+        worst = max(duplicates.values(), default=1)
+        if self.budget['HEADERS']:
+            response['X-DB-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.2f}'
+            response['X-DB-Duplicate-Queries'] = str(sum(runs - 1 for runs in duplicates.values()))
+
+        problems = []
+        if recorder.count > self.budget['MAX_QUERIES']:
+            problems.append(f"{recorder.count} queries (budget {self.budget['MAX_QUERIES']})")
+        if worst > self.budget['MAX_DUPLICATES']:
+            sql = max(duplicates, key=duplicates.get)
+            problems.append(
+                f"statement repeated {worst} times (budget {self.budget['MAX_DUPLICATES']}): {sql}"
+            )
+
+        if problems:
+            message = f"Query budget exceeded for {request.method} {request.path}: " + '; '.join(problems)
+            if self.budget['ACTION'] == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        else:
+            logger.debug(
+                "%s %s: %d queries, %.2f ms", request.method, request.path,
+                recorder.count, recorder.duration * 1000,
+            )
+        return response
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        metrics.request_latency.observe(elapsed, view=view, method=request.method)
+        metrics.requests_total.inc(view=view, method=request.method, status=response.status_code)
+
+        recorder = getattr(request, 'db_queries', None)
+        if recorder is not None:
+            metrics.request_db_time.observe(recorder.duration, view=view, method=request.method)
+            metrics.request_queries.inc(recorder.count, view=view)
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), view=view, method=request.method)
+        return response
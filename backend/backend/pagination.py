@@ -0,0 +1,135 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is read with `WHERE (ordering) after (last row of the previous
+page) ORDER BY ordering LIMIT page_size + 1`, so every page costs the
+same index range scan however deep the client has paged, unlike OFFSET.
+The ordering must be unique (end it with the primary key) and should
+match an index. Cursors are opaque URL-safe tokens carrying the ordering
+values of the last row served.
+
+Query parameters:
+
+    ?page_size=N   rows per page, capped at the endpoint's maximum
+    ?cursor=...    token from the previous page's `next` link
+    ?count=true    also return the total row count (one extra COUNT query)
+
+    rows, page = paginate_keyset(queryset, request, ordering=['-buy_date', '-id'])
+    return Response({'results': [...], **page})
+
+KeysetPagination wraps the same thing for DRF generic views.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+DEFAULT_PAGE_SIZE = getattr(settings, 'KEYSET_PAGE_SIZE', 100)
+MAX_PAGE_SIZE = getattr(settings, 'KEYSET_MAX_PAGE_SIZE', 1000)
+
+
+class InvalidPage(ValueError):
+    pass
+
+
+def _encode(values):
+    payload = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def _decode(cursor, fields, model):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except Exception:
+        raise InvalidPage('Invalid cursor')
+
+
+def _after(ordering, values):
+    """
+    Rows strictly after `values` in `ordering`, as one Q:
+    a > x OR (a = x AND b > y) OR ... with < for descending fields
+    """
+    condition = Q(pk__in=[])
+    for depth, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        equal = {prior.lstrip('-'): value for prior, value in zip(ordering[:depth], values)}
+        condition |= Q(**equal, **{f'{name}__{lookup}': values[depth]})
+    return condition
+
+
+def page_size_param(params, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    value = params.get('page_size')
+    if not value:
+        return default
+    try:
+        size = int(value)
+    except ValueError:
+        raise InvalidPage('Invalid page_size')
+    if size <= 0:
+        raise InvalidPage('page_size must be greater than 0')
+    return min(size, maximum)
+
+
+def paginate_keyset(queryset, request, ordering, default_page_size=DEFAULT_PAGE_SIZE,
+                    max_page_size=MAX_PAGE_SIZE, values=None):
+    """
+    One page of `queryset` in `ordering` for `request`. Returns (rows,
+    page) where page holds `next` (URL of the following page or None),
+    `page_size` and, when ?count=true, `count`. `values` (field names)
+    reads rows with values() instead of model instances. Raises
+    InvalidPage for a bad cursor or page size.
+    """
+    params = request.GET
+    fields = [field.lstrip('-') for field in ordering]
+    size = page_size_param(params, default_page_size, max_page_size)
+
+    page = queryset.order_by(*ordering)
+    cursor = params.get('cursor')
+    if cursor:
+        page = page.filter(_after(ordering, _decode(cursor, fields, queryset.model)))
+    if values is not None:
+        page = page.values(*dict.fromkeys([*values, *fields]))
+    rows = list(page[:size + 1])
+
+    next_url = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        key = [last[field] if values is not None else getattr(last, field) for field in fields]
+        query = params.copy()
+        query['cursor'] = _encode(key)
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+    result = {'next': next_url, 'page_size': size}
+    if params.get('count', '').lower() in ('1', 'true', 'yes'):
+        result['count'] = queryset.count()
+    return rows, result
+
+
+class KeysetPagination(BasePagination):
+    """
+    paginate_keyset() for DRF generic views; set `ordering` on a subclass
+    """
+    ordering = ['id']
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        try:
+            rows, self.page = paginate_keyset(
+                queryset, request, self.ordering, self.page_size, self.max_page_size
+            )
+        except InvalidPage as e:
+            raise ValidationError({'error': str(e)})
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, **self.page})
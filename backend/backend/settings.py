@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.RequestMetricsMiddleware',
+    'backend.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,6 +97,37 @@ REST_FRAMEWORK = {
 }
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+# Default and largest page sizes for keyset-paginated lists, see backend/pagination.py
+KEYSET_PAGE_SIZE = 100
+KEYSET_MAX_PAGE_SIZE = 1000
+
+# Memory budget for the per-process LRU cache of per-symbol OHLC arrays
+# loaded from the database (memory-mapped columnar store arrays are not counted)
+STOCK_OHLC_CACHE_BYTES = 64 * 1024 * 1024
+
+# Per-request SQL query budget, see backend/middleware.py.
+# Use 'ACTION': 'raise' in test settings to fail on regressions.
+QUERY_BUDGET = {
+    'MAX_QUERIES': 50,
+    'MAX_DUPLICATES': 5,
+    'ACTION': 'warn',
+    'HEADERS': DEBUG,
+}
+
+# Memory-mapped columnar OHLC store shared by all worker processes.
+# Set to None to read OHLC arrays from the database only.
+STOCK_COLUMNAR_STORE_DIR = BASE_DIR / 'columnar_store'
+
+# Background ingest jobs for admin CSV uploads (stock_scraper.jobs)
+INGEST_UPLOAD_DIR = BASE_DIR / 'ingest_uploads'
+INGEST_JOB_WORKERS = 1
+
+# Processes used to backtest the universe (None: one per CPU)
+BACKTEST_WORKERS = None
+# Threads computing uncached backtests and sweeps for the API, apart from
+# the ingest job worker (stock_scraper.backtest)
+BACKTEST_JOB_WORKERS = 1
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StockScraperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stock_scraper'
+
+    def ready(self):
+        # Connect ohlc_written receivers
+        from stock_scraper import columnar_store, indicator_table, ohlc_cache, snapshots  # noqa: F401
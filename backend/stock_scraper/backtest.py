@@ -0,0 +1,215 @@
+"""
+Universe backtests of the strategy signals, cached per universe version.
+
+The API only serves cached reports: a cache miss queues the computation
+on a background thread pool of its own (settings.BACKTEST_JOB_WORKERS,
+default 1, separate from the ingest job worker so a long sweep never
+holds up an upload) and the client retries.
+"""
+import logging
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from backend.metrics import cache_lookups
+
+from stock_scraper.backtest_engine import BACKTEST_STRATEGIES, METRICS, backtest_matrix, sweep_matrix
+from stock_scraper.indicators import first_valid_index, optional_float
+from stock_scraper.snapshots import universe_version
+from stock_scraper.universe import load_close_matrix
+
+# Costs (basis points per position change) the API computes; a request for
+# any other cost is served the nearest one, so few reports need caching
+COST_BPS_LEVELS = (0, 5, 10, 25, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+_pending = set()
+_pending_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def nearest_cost_bps(cost_bps):
+    return min(COST_BPS_LEVELS, key=lambda level: abs(level - cost_bps))
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKTEST_JOB_WORKERS', 1), thread_name_prefix='backtest'
+            )
+        return _executor
+
+
+def _compute_in_background(key, compute):
+    """
+    Cache compute() under `key` on the backtest thread pool, queued once
+    however many requests miss the cache meanwhile
+    """
+    with _pending_lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+
+    def run():
+        try:
+            cache.set(key, compute(), None)
+        except Exception:
+            logger.exception('Error computing %s', key)
+        finally:
+            with _pending_lock:
+                _pending.discard(key)
+            # Worker threads do not go through request_finished, so close here
+            connection.close()
+
+    _get_executor().submit(run)
+
+
+def backtest_workers():
+    return getattr(settings, 'BACKTEST_WORKERS', None) or os.cpu_count() or 1
+
+
+def _summary(results):
+    traded = results['trades'] > 0
+    trades = int(results['trades'].sum())
+    wins = np.nansum(results['hit_rate'] / 100 * results['trades'])
+    return {
+        'symbols': int(len(traded)),
+        'symbols_traded': int(traded.sum()),
+        'trades': trades,
+        'hit_rate': optional_float(wins / trades * 100) if trades else None,
+        **{
+            f'median_{metric}': optional_float(np.nanmedian(results[metric])) if len(traded) else None
+            for metric in ('total_return', 'annualized_return', 'buy_and_hold_return', 'max_drawdown', 'turnover')
+        },
+    }
+
+
+def backtest_universe(symbols=None, strategies=None, cost_bps=0.0, workers=None):
+    """
+    Backtest `strategies` (default: all) on every symbol (or the given
+    ones), charging `cost_bps` basis points per position change.
+    Returns {strategy: {'name', 'type', 'summary', 'symbols': [...]}}.
+    """
+    strategies = list(BACKTEST_STRATEGIES if strategies is None else strategies)
+    names, dates, closes = load_close_matrix(symbols)
+    if not names:
+        return {}
+
+    results = backtest_matrix(closes, strategies, cost_bps / 10000, workers or backtest_workers())
+    first = first_valid_index(closes)
+    starts = [str(dates[i, min(first[i], dates.shape[1] - 1)]) for i in range(len(names))]
+
+    report = {}
+    for key, metrics in results.items():
+        report[key] = {
+            'name': BACKTEST_STRATEGIES[key]['name'],
+            'type': BACKTEST_STRATEGIES[key]['type'],
+            'summary': _summary(metrics),
+            'symbols': [
+                {
+                    'symbol': symbol,
+                    'start': starts[i],
+                    'end': str(dates[i, -1]),
+                    **{
+                        metric: int(metrics[metric][i]) if metric == 'trades' else optional_float(metrics[metric][i])
+                        for metric in METRICS
+                    },
+                }
+                for i, symbol in enumerate(names)
+            ],
+        }
+    return report
+
+
+def cached_backtest(strategies=None, cost_bps=0.0, background=False):
+    """
+    Cached backtest_universe() for the whole universe, recomputed once new
+    bars are ingested. With `background` a miss is queued on the backtest
+    thread pool and None is returned instead of computing in the caller.
+    """
+    strategies = sorted(BACKTEST_STRATEGIES if strategies is None else strategies)
+    key = f"stock_scraper:backtest:{universe_version()}:{','.join(strategies)}:{cost_bps}"
+    report = cache.get(key)
+    cache_lookups.inc(cache='backtest', result='miss' if report is None else 'hit')
+    if report is None:
+        def compute():
+            return backtest_universe(strategies=strategies, cost_bps=cost_bps)
+        if background:
+            _compute_in_background(key, compute)
+            return None
+        report = compute()
+        cache.set(key, report, None)
+    return report
+
+
+def _matrix(values):
+    return [[optional_float(value) for value in row] for row in values]
+
+
+def sweep_universe(short_windows, long_windows, kind='ma', metric='total_return', cost_bps=0.0,
+                   symbols=None, workers=None):
+    """
+    Crossover `metric` (one of SWEEP_METRICS) for every short/long window
+    pair on every symbol. Returns the window axes, the universe median
+    matrix, the best pair overall and per symbol, and each symbol's own
+    matrix.
+    """
+    names, dates, closes = load_close_matrix(symbols)
+    cube = sweep_matrix(
+        closes, short_windows, long_windows, kind, metric, cost_bps / 10000, workers or backtest_workers()
+    ) if names else np.empty((len(short_windows), len(long_windows), 0))
+
+    def best(matrix):
+        if np.isnan(matrix).all():
+            return None
+        i, j = np.unravel_index(np.nanargmax(matrix), matrix.shape)
+        return {'short': short_windows[i], 'long': long_windows[j], 'value': optional_float(matrix[i, j])}
+
+    # Skipped pairs (short >= long) are all NaN; keep nanmedian quiet about them
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        universe = np.nanmedian(cube, axis=2)
+    return {
+        'kind': kind,
+        'metric': metric,
+        'cost_bps': cost_bps,
+        'short_windows': list(short_windows),
+        'long_windows': list(long_windows),
+        'universe': {'median': _matrix(universe), 'best': best(universe)},
+        'symbols': [
+            {'symbol': symbol, 'best': best(cube[:, :, i]), 'matrix': _matrix(cube[:, :, i])}
+            for i, symbol in enumerate(names)
+        ],
+    }
+
+
+def cached_sweep(short_windows, long_windows, kind='ma', metric='total_return', cost_bps=0.0, background=False):
+    """
+    Cached sweep_universe() for the whole universe; `background` as for
+    cached_backtest()
+    """
+    key = (
+        f"stock_scraper:sweep:{universe_version()}:{kind}:{metric}:{cost_bps}:"
+        f"{','.join(map(str, short_windows))}:{','.join(map(str, long_windows))}"
+    )
+    report = cache.get(key)
+    cache_lookups.inc(cache='sweep', result='miss' if report is None else 'hit')
+    if report is None:
+        def compute():
+            return sweep_universe(short_windows, long_windows, kind, metric, cost_bps)
+        if background:
+            _compute_in_background(key, compute)
+            return None
+        report = compute()
+        cache.set(key, report, None)
+    return report
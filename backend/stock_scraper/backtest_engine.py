@@ -0,0 +1,233 @@
+"""
+Vectorized backtests of the strategy signals over a (symbols x bars)
+close matrix.
+
+Signals become long-only positions: long from a buy signal until the next
+sell signal, flat otherwise. A position decided on a bar's close is held
+from the next bar, and every position change costs `cost` (a fraction of
+equity). All symbols are simulated at once with whole-array operations;
+backtest_matrix() can also split the rows across worker processes.
+sweep_matrix() does the same for a grid of MA/EMA crossover window pairs,
+backtesting every (pair, symbol) combination as one batch.
+
+Nothing here touches Django, so pool workers can import it under any
+multiprocessing start method.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from stock_scraper.indicators import (
+    calculate_ema,
+    calculate_strategy_indicators,
+    first_valid_index,
+    max_drawdown,
+    rolling_means,
+)
+from stock_scraper.strategies import (
+    GOLDEN_CROSS_START,
+    MA_CROSSOVER_STRATEGIES,
+    crossover_signals,
+    golden_cross_momentum_signals,
+)
+
+TRADING_DAYS = 252
+
+BACKTEST_STRATEGIES = {
+    'golden_cross_momentum': {
+        'name': 'Golden Cross with RSI Momentum',
+        'type': 'Long-term Trend',
+    },
+    **MA_CROSSOVER_STRATEGIES,
+}
+
+# Default short/long window grid for parameter sweeps
+SWEEP_SHORT_WINDOWS = (5, 10, 15, 20, 25, 30, 40, 50)
+SWEEP_LONG_WINDOWS = (50, 75, 100, 125, 150, 175, 200, 250)
+# Metrics a sweep can rank pairs by (higher is better)
+SWEEP_METRICS = ('total_return', 'annualized_return', 'hit_rate', 'max_drawdown')
+# Floats held per batched sweep array; bounds the rows swept at once
+SWEEP_BATCH_VALUES = 4_000_000
+
+METRICS = (
+    'total_return', 'annualized_return', 'buy_and_hold_return', 'max_drawdown',
+    'trades', 'hit_rate', 'turnover', 'exposure',
+)
+
+
+def strategy_signals(closes, strategies=None):
+    """
+    Signal matrix for each strategy key in `strategies` (default: all)
+    """
+    strategies = list(BACKTEST_STRATEGIES if strategies is None else strategies)
+    indicators = calculate_strategy_indicators(closes)
+    signals = {}
+    for key in strategies:
+        if key == 'golden_cross_momentum':
+            start = first_valid_index(closes) + GOLDEN_CROSS_START
+            signals[key] = golden_cross_momentum_signals(
+                indicators['MA50'], indicators['MA200'], indicators['RSI'], start
+            )
+        else:
+            strategy = MA_CROSSOVER_STRATEGIES[key]
+            signals[key] = crossover_signals(indicators[strategy['short_ma']], indicators[strategy['long_ma']])
+    return signals
+
+
+def positions_from_signals(signals):
+    """
+    1 from a buy signal until the next sell signal, 0 otherwise
+    """
+    signals = np.asarray(signals)
+    columns = np.arange(signals.shape[-1])
+    last_signal = np.maximum.accumulate(np.where(signals != 0, columns, -1), axis=-1)
+    state = np.take_along_axis(signals, np.maximum(last_signal, 0), axis=-1)
+    return ((state == 1) & (last_signal >= 0)).astype(np.int8)
+
+
+def simple_returns(closes):
+    """
+    Bar-over-bar returns, 0 where either close is missing or not positive
+    """
+    returns = np.zeros(closes.shape, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[:, 1:] = closes[:, 1:] / closes[:, :-1] - 1
+    returns[:, 1:][~(closes[:, :-1] > 0)] = 0.0
+    return np.where(np.isfinite(returns), returns, 0.0)
+
+
+def backtest_positions(closes, positions, cost=0.0):
+    """
+    Performance of every row of `positions` against the same rows of
+    `closes`. Returns {metric: array with one value per symbol}; returns,
+    drawdown, hit rate and exposure are in percent, turnover is position
+    changes per year.
+    """
+    returns = simple_returns(closes)
+    held = np.zeros(closes.shape, dtype=np.float64)
+    held[:, 1:] = positions[:, :-1]
+    changes = np.abs(np.diff(held, axis=1, prepend=0.0))
+    strategy = held * returns - cost * changes
+
+    bars = (~np.isnan(closes)).sum(axis=1)
+    years = np.maximum(bars - 1, 1) / TRADING_DAYS
+    equity = np.cumprod(1 + strategy, axis=1)
+    total = equity[:, -1] - 1
+    with np.errstate(invalid='ignore'):
+        annualized = np.where(total > -1, (1 + np.maximum(total, -1)) ** (1 / years) - 1, -1.0)
+
+    # Trades are runs of held bars; each trade's return includes its exit cost
+    symbols, length = held.shape
+    change = np.diff(np.pad(held, ((0, 0), (1, 1))), axis=1)
+    entry_rows, entry_columns = np.nonzero(change == 1)
+    _, exit_columns = np.nonzero(change == -1)
+    with np.errstate(divide='ignore'):
+        log_equity = np.zeros((symbols, length + 1))
+        log_equity[:, 1:] = np.cumsum(np.log1p(strategy), axis=1)
+    trade_returns = np.expm1(
+        log_equity[entry_rows, np.minimum(exit_columns + 1, length)] - log_equity[entry_rows, entry_columns]
+    )
+    trades = np.bincount(entry_rows, minlength=symbols)
+    wins = np.bincount(entry_rows, weights=trade_returns > 0, minlength=symbols)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hit_rate = np.where(trades > 0, wins / trades * 100, np.nan)
+
+    results = {
+        'total_return': total * 100,
+        'annualized_return': annualized * 100,
+        'buy_and_hold_return': (np.prod(1 + returns, axis=1) - 1) * 100,
+        'max_drawdown': max_drawdown(equity),
+        'trades': trades,
+        'hit_rate': hit_rate,
+        'turnover': changes.sum(axis=1) / years,
+        'exposure': held.sum(axis=1) / np.maximum(bars - 1, 1) * 100,
+    }
+    no_history = bars < 2
+    for key in METRICS:
+        if key != 'trades':
+            results[key] = np.where(no_history, np.nan, results[key])
+    return results
+
+
+def _backtest_rows(closes, strategies, cost):
+    signals = strategy_signals(closes, strategies)
+    return {
+        key: backtest_positions(closes, positions_from_signals(signal), cost)
+        for key, signal in signals.items()
+    }
+
+
+def backtest_matrix(closes, strategies=None, cost=0.0, workers=1):
+    """
+    Backtest every strategy on every row of `closes`, splitting the rows
+    across `workers` processes. Returns {strategy: {metric: array}}.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    workers = max(1, min(workers, len(closes)))
+    if workers == 1:
+        return _backtest_rows(closes, strategies, cost)
+
+    chunks = np.array_split(closes, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_backtest_rows, chunks, repeat(strategies), repeat(cost)))
+    return {
+        key: {metric: np.concatenate([part[key][metric] for part in parts]) for metric in METRICS}
+        for key in parts[0]
+    }
+
+
+def moving_averages(closes, windows, kind='ma'):
+    """
+    (windows, symbols, bars) moving averages of `kind` 'ma' or 'ema'
+    """
+    if kind == 'ma':
+        return rolling_means(closes, windows)
+    return np.stack([calculate_ema(closes, window) for window in windows])
+
+
+def _sweep_rows(closes, short_windows, long_windows, kind, metric, cost):
+    windows = sorted(set(short_windows) | set(long_windows))
+    averages = moving_averages(closes, windows, kind)
+    position = {window: k for k, window in enumerate(windows)}
+    pairs = [
+        (i, j) for i, short in enumerate(short_windows) for j, long in enumerate(long_windows) if short < long
+    ]
+
+    result = np.full((len(short_windows), len(long_windows), len(closes)), np.nan)
+    if not pairs:
+        return result
+    # Every (pair, symbol) becomes one row of a single batched backtest
+    short = averages[[position[short_windows[i]] for i, _ in pairs]].reshape(-1, closes.shape[1])
+    long = averages[[position[long_windows[j]] for _, j in pairs]].reshape(-1, closes.shape[1])
+    tiled = np.tile(closes, (len(pairs), 1))
+    values = backtest_positions(tiled, positions_from_signals(crossover_signals(short, long)), cost)[metric]
+    values = values.reshape(len(pairs), len(closes))
+    for (i, j), row in zip(pairs, values):
+        result[i, j] = row
+    return result
+
+
+def sweep_matrix(closes, short_windows=SWEEP_SHORT_WINDOWS, long_windows=SWEEP_LONG_WINDOWS,
+                 kind='ma', metric='total_return', cost=0.0, workers=1):
+    """
+    `metric` of the crossover strategy for every short/long window pair
+    (short < long) on every row of `closes`, as a (short, long, symbols)
+    array with NaN for skipped pairs. Rows are swept in batches sized to
+    SWEEP_BATCH_VALUES, spread across `workers` processes.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    short_windows, long_windows = list(short_windows), list(long_windows)
+    pairs = max(1, sum(short < long for short in short_windows for long in long_windows))
+    batch_rows = max(1, SWEEP_BATCH_VALUES // (pairs * max(closes.shape[1], 1)))
+    batches = [closes[start:start + batch_rows] for start in range(0, len(closes), batch_rows)]
+    if not batches:
+        return np.full((len(short_windows), len(long_windows), 0), np.nan)
+
+    arguments = (repeat(short_windows), repeat(long_windows), repeat(kind), repeat(metric), repeat(cost))
+    if workers <= 1 or len(batches) == 1:
+        parts = list(map(_sweep_rows, batches, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            parts = list(pool.map(_sweep_rows, batches, *arguments))
+    return np.concatenate(parts, axis=2)
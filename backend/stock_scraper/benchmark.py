@@ -0,0 +1,279 @@
+"""
+Benchmark harness for the market-data code paths.
+
+synthetic_universe() generates a reproducible random-walk OHLC universe
+(same seed, same bars), load_universe() writes it into the current
+database and run_benchmarks() times the indicator functions, the
+market-data views and the CSV ingest paths. Used by the `benchmark`
+management command, which runs everything against a throwaway test
+database and saves the timings as JSON.
+"""
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+
+from stock_scraper.indicators import (
+    calculate_ema,
+    calculate_ma,
+    calculate_rsi,
+    calculate_strategy_indicators,
+)
+from stock_scraper.models import Investment, StockOHLC
+from stock_scraper.signals import ohlc_written
+from stock_scraper.universe import load_close_matrix
+
+TRADING_DAYS = 252
+# Last bar of every synthetic series, fixed so runs are comparable
+END_DATE = '2024-12-31'
+INSERT_BATCH = 5000
+# Seconds to wait for a background ingest job before giving up
+JOB_TIMEOUT = 600
+
+
+def synthetic_bars(rng, dates):
+    """
+    One symbol's OHLCV random walk over `dates` as a DataFrame
+    """
+    days = len(dates)
+    log_returns = rng.normal(0.0003, 0.02, days)
+    close = rng.uniform(50, 500) * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate(([close[0]], close[:-1])) * np.exp(rng.normal(0, 0.005, days))
+    wick = np.abs(rng.normal(0, 0.01, days))
+    return pd.DataFrame({
+        'date': dates,
+        'open': open_.round(2),
+        'high': (np.maximum(open_, close) * (1 + wick)).round(2),
+        'low': (np.minimum(open_, close) * (1 - wick)).round(2),
+        'close': close.round(2),
+        'volume': rng.lognormal(11, 1, days).astype(np.int64),
+    })
+
+
+def synthetic_universe(symbols=1000, years=20, seed=0):
+    """
+    Yield (symbol, bars) for `symbols` synthetic symbols with `years` of
+    business-day bars each. Every symbol has its own seeded generator, so
+    a smaller universe is a prefix of a larger one.
+    """
+    dates = pd.bdate_range(end=END_DATE, periods=years * TRADING_DAYS)
+    for index in range(symbols):
+        yield f'syn{index:04d}', synthetic_bars(np.random.default_rng([seed, index]), dates)
+
+
+def load_universe(symbols=1000, years=20, seed=0):
+    """
+    Insert a synthetic universe into StockOHLC and build the derived data
+    (snapshots, indicator table, columnar store) the views read.
+    Returns the symbols written.
+    """
+    written = []
+    batch = []
+    for symbol, bars in synthetic_universe(symbols, years, seed):
+        written.append(symbol)
+        batch.extend(
+            StockOHLC(symbol=symbol, date=row.date.date(), open=row.open, high=row.high,
+                      low=row.low, close=row.close, volume=row.volume, percent=0.0)
+            for row in bars.itertuples(index=False)
+        )
+        if len(batch) >= INSERT_BATCH:
+            StockOHLC.objects.bulk_create(batch, batch_size=INSERT_BATCH)
+            batch = []
+    StockOHLC.objects.bulk_create(batch, batch_size=INSERT_BATCH)
+    ohlc_written.send(sender=load_universe, symbols=written, replaced=True)
+    return written
+
+
+def write_upload_csv(bars, path):
+    """
+    CSV in the layout admins upload: m/d/Y dates, comma-grouped volume
+    """
+    frame = bars.rename(columns=str.capitalize)
+    frame['Date'] = frame['Date'].dt.strftime('%m/%d/%Y')
+    frame['Volume'] = frame['Volume'].map('{:,}'.format)
+    frame.to_csv(path, index=False)
+
+
+def write_folder_csv(bars, path):
+    """
+    CSV in the layout seed_stocks reads: ISO dates, plain volume
+    """
+    frame = bars.rename(columns=str.capitalize)
+    frame['Date'] = frame['Date'].dt.strftime('%Y-%m-%d')
+    frame['Percent'] = 0.0
+    frame.to_csv(path, index=False)
+
+
+def time_call(func, repeat, setup=None):
+    """
+    Run `func` `repeat` times (calling untimed `setup` before each run)
+    and summarize the wall-clock seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'runs': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'max': max(timings),
+    }
+
+
+def _request(client, path, **headers):
+    def run():
+        response = client.get(path, **headers)
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} answered {response.status_code}')
+    return run
+
+
+def _stream(client, path, **headers):
+    def run():
+        response = client.get(path, **headers)
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} answered {response.status_code}')
+        for _ in response.streaming_content:
+            pass
+    return run
+
+
+def _delete_symbols(*symbols):
+    def run():
+        StockOHLC.objects.filter(symbol__in=symbols).delete()
+        ohlc_written.send(sender=run_benchmarks, symbols=list(symbols), replaced=True)
+    return run
+
+
+def run_benchmarks(symbol, admin_token, user_token, workdir, repeat=5, csv_files=5, years=20, seed=0):
+    """
+    Time every benchmark against the loaded universe; `symbol` is the one
+    the per-symbol views and 1-D indicators use. Returns {name: timings}.
+    """
+    results = {}
+    client = Client()
+    closes = StockOHLC.objects.filter(symbol=symbol).order_by('date').values_list('close', flat=True)
+    closes = np.fromiter(closes, dtype=np.float64)
+    _, _, universe = load_close_matrix()
+
+    results['indicators.ma200'] = time_call(lambda: calculate_ma(closes, 200), repeat)
+    results['indicators.ema21'] = time_call(lambda: calculate_ema(closes, 21), repeat)
+    results['indicators.rsi14'] = time_call(lambda: calculate_rsi(closes, 14), repeat)
+    results['indicators.strategy_universe'] = time_call(
+        lambda: calculate_strategy_indicators(universe), repeat
+    )
+
+    results['views.golden_cross_momentum'] = time_call(
+        _request(client, f'/stock_scraper/strategy/{symbol}/'), repeat
+    )
+    results['views.ma_crossover_strategy'] = time_call(
+        _request(client, f'/stock_scraper/ma_crossover/{symbol}/'), repeat
+    )
+    results['views.get_stocks_data'] = time_call(_request(client, '/stock_scraper/stocks/'), repeat)
+    results['views.get_investments'] = time_call(
+        _request(client, '/stock_scraper/investments/', HTTP_AUTHORIZATION=f'Bearer {user_token}'),
+        repeat,
+    )
+    results['views.export_ohlc'] = time_call(
+        _stream(client, '/stock_scraper/export/', HTTP_AUTHORIZATION=f'Bearer {user_token}'), repeat
+    )
+    results['views.get_portfolio'] = time_call(
+        _request(client, '/stock_scraper/investments/portfolio/', HTTP_AUTHORIZATION=f'Bearer {user_token}'),
+        repeat,
+    )
+
+    # Ingest symbols sit outside the synthetic universe's seeds
+    csv_bars = list(synthetic_universe(csv_files + 1, years, seed + 1))
+    upload_path = os.path.join(workdir, 'upload.csv')
+    write_upload_csv(csv_bars[0][1], upload_path)
+    single_path = os.path.join(workdir, 'single.csv')
+    write_folder_csv(csv_bars[0][1], single_path)
+    folder = os.path.join(workdir, 'folder')
+    os.makedirs(folder, exist_ok=True)
+    folder_symbols = []
+    for index, (_, bars) in enumerate(csv_bars[1:]):
+        folder_symbols.append(f'csvfolder{index}')
+        write_folder_csv(bars, os.path.join(folder, f'{folder_symbols[-1]}.csv'))
+
+    def upload():
+        with open(upload_path, 'rb') as csv_file:
+            response = client.post(
+                '/api/admin/seed-stocks/',
+                {'csv_file': csv_file, 'stock_title': 'csvupload'},
+                HTTP_AUTHORIZATION=f'Bearer {admin_token}',
+            )
+        if response.status_code >= 300:
+            raise RuntimeError(f'Upload answered {response.status_code}: {response.content[:200]}')
+        # The upload is imported by a background job; wait for it to finish
+        status_path = f"/api/admin/seed-stocks/jobs/{response.json()['job_id']}/"
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while True:
+            job = client.get(status_path, HTTP_AUTHORIZATION=f'Bearer {admin_token}').json()
+            if job['status'] == 'failed':
+                raise RuntimeError(f"Ingest job failed: {job['message']}")
+            if job['status'] == 'succeeded':
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Ingest job still {job['status']} after {JOB_TIMEOUT}s")
+            time.sleep(0.01)
+
+    try:
+        with open(os.devnull, 'w') as devnull:
+            results['ingest.admin_seed_stocks'] = time_call(upload, repeat, _delete_symbols('csvupload'))
+            results['ingest.seed_single_file'] = time_call(
+                lambda: call_command('seed_stocks', file=single_path, symbol='csvfile', stdout=devnull),
+                repeat, _delete_symbols('csvfile'),
+            )
+            results['ingest.seed_folder'] = time_call(
+                lambda: call_command('seed_stocks', folder=folder, stdout=devnull),
+                repeat, _delete_symbols(*folder_symbols),
+            )
+    finally:
+        # Leave only the synthetic universe behind (matters with --keepdb)
+        _delete_symbols('csvupload', 'csvfile', *folder_symbols)()
+    return results
+
+
+def create_investments(user, symbol, count):
+    bars = list(StockOHLC.objects.filter(symbol=symbol).order_by('date')[:count])
+    Investment.objects.bulk_create(
+        Investment(user=user, stock=bar, buy_price=bar.close, quantity=10, buy_date=bar.date)
+        for bar in bars
+    )
+
+
+def environment():
+    """
+    What a run was measured on, so results from different commits can be
+    lined up
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
@@ -0,0 +1,151 @@
+"""
+On-disk columnar OHLC store shared by every worker process.
+
+Each symbol gets one .npy file per column, written at ingest and opened
+with memory mapping, so all workers on a node read the same page-cache
+pages without copying. StockOHLC stays the system of record; the store can
+be rebuilt from it at any time with the build_columnar_store command.
+
+Layout (STOCK_COLUMNAR_STORE_DIR):
+
+    <symbol>/CURRENT                  name of the live version directory
+    <symbol>/<version>/<column>.npy   date, open, high, low, close, volume
+    <symbol>/<version>/SNAPSHOT       StockSnapshot.updated_at the bars match
+
+A rewrite goes to a fresh version directory and then swaps CURRENT, so
+readers never see a half-written symbol. Symbols are rewritten whenever
+their snapshot is refreshed, and readers pass the snapshot version they
+expect: a store entry tagged with any other version is ignored and the
+caller falls back to the database.
+"""
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.dispatch import receiver
+
+from stock_scraper.models import StockOHLC, StockSnapshot
+from stock_scraper.signals import snapshots_refreshed
+
+COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+# Symbols are used as directory names; anything else is left to the database
+SAFE_SYMBOL = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+def store_dir():
+    path = getattr(settings, 'STOCK_COLUMNAR_STORE_DIR', None)
+    return None if path is None else os.fspath(path)
+
+
+def _symbol_dir(symbol):
+    root = store_dir()
+    if root is None or not SAFE_SYMBOL.match(symbol):
+        return None
+    return os.path.join(root, symbol)
+
+
+def _current_version(path):
+    try:
+        with open(os.path.join(path, 'CURRENT')) as current:
+            return current.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _load_arrays(symbol):
+    frame = pd.DataFrame.from_records(
+        StockOHLC.objects.filter(symbol=symbol).order_by('date').values_list(*COLUMNS),
+        columns=list(COLUMNS),
+    )
+    arrays = {'date': pd.to_datetime(frame['date']).to_numpy().astype('datetime64[D]')}
+    for column in COLUMNS[1:]:
+        arrays[column] = frame[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def _version_time(name):
+    # Version directories are named <time_ns>-<pid>
+    stamp, _, pid = name.partition('-')
+    return int(stamp) if stamp.isdigit() and pid.isdigit() else None
+
+
+def _snapshot_version(symbol):
+    updated_at = StockSnapshot.objects.filter(symbol=symbol).values_list('updated_at', flat=True).first()
+    return None if updated_at is None else updated_at.isoformat()
+
+
+def write_symbol(symbol, snapshot_version=None):
+    """
+    Write a symbol's full history from StockOHLC into the store, tagged
+    with its snapshot version (looked up when not given), or remove it when
+    the symbol has no bars or no snapshot. Returns the number of bars written.
+    """
+    path = _symbol_dir(symbol)
+    if path is None:
+        return 0
+    if snapshot_version is None:
+        snapshot_version = _snapshot_version(symbol)
+    arrays = _load_arrays(symbol) if snapshot_version is not None else None
+    if arrays is None or not len(arrays['date']):
+        shutil.rmtree(path, ignore_errors=True)
+        return 0
+
+    version = f'{time.time_ns()}-{os.getpid()}'
+    version_dir = os.path.join(path, version)
+    os.makedirs(version_dir)
+    for column in COLUMNS:
+        np.save(os.path.join(version_dir, f'{column}.npy'), np.ascontiguousarray(arrays[column]))
+    with open(os.path.join(version_dir, 'SNAPSHOT'), 'w') as snapshot:
+        snapshot.write(snapshot_version)
+
+    pointer = os.path.join(path, f'CURRENT.{version}')
+    with open(pointer, 'w') as current:
+        current.write(version)
+    os.replace(pointer, os.path.join(path, 'CURRENT'))
+
+    # Only versions older than this one are removed: a newer directory may
+    # still be filling for a concurrent writer. Open memory maps keep old
+    # files readable until they are closed.
+    published = _version_time(version)
+    for entry in os.listdir(path):
+        written = _version_time(entry)
+        if written is not None and written < published:
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+    return len(arrays['date'])
+
+
+def open_symbol(symbol, snapshot_version):
+    """
+    Memory-mapped read-only column arrays for a symbol, or None when the
+    store is disabled, does not hold the symbol or holds bars from another
+    snapshot version
+    """
+    path = _symbol_dir(symbol)
+    if path is None or snapshot_version is None:
+        return None
+    version = _current_version(path)
+    if version is None:
+        return None
+    try:
+        with open(os.path.join(path, version, 'SNAPSHOT')) as snapshot:
+            if snapshot.read() != snapshot_version:
+                return None
+        return {
+            column: np.load(os.path.join(path, version, f'{column}.npy'), mmap_mode='r')
+            for column in COLUMNS
+        }
+    except FileNotFoundError:
+        # CURRENT moved on while we were opening; the caller falls back
+        return None
+
+
+@receiver(snapshots_refreshed)
+def write_refreshed_symbols(sender, versions, **kwargs):
+    if store_dir() is None:
+        return
+    for symbol, snapshot_version in versions.items():
+        write_symbol(symbol, snapshot_version)
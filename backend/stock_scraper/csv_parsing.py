@@ -0,0 +1,130 @@
+"""
+Column-wise parsing of OHLC CSV files.
+
+CSV files are read in fixed-size chunks so memory stays bounded however
+large the file is. Each chunk is cleaned with whole-column pandas
+operations: dates try the m/d/Y export format first and fall back to
+pandas' own parser, numbers may carry thousands separators. Rows that
+do not parse are dropped and reported instead of failing the file.
+
+Nothing here touches Django, so process-pool workers can import it
+without setting Django up.
+"""
+import os
+
+import pandas as pd
+
+COLUMN_MAPPING = {
+    'Date': 'date',
+    'date': 'date',
+    'Open': 'open',
+    'open': 'open',
+    'High': 'high',
+    'high': 'high',
+    'Low': 'low',
+    'low': 'low',
+    'Close': 'close',
+    'close': 'close',
+    'Volume': 'volume',
+    'volume': 'volume',
+    'Percent': 'percent',
+    'percent': 'percent',
+}
+REQUIRED_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+CHUNK_ROWS = 10000
+
+
+class CSVColumnsError(ValueError):
+    def __init__(self, missing):
+        super().__init__(f'Missing columns: {missing}')
+        self.missing = missing
+
+
+def parse_dates(values):
+    """
+    Dates from a column of m/d/Y strings (or anything pandas can parse),
+    NaT where parsing fails
+    """
+    parsed = pd.to_datetime(values, format='%m/%d/%Y', errors='coerce')
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format='mixed', errors='coerce')
+    return parsed.dt.date
+
+
+def parse_numbers(values):
+    """
+    Floats from a column that may hold '1,234.5' style strings, NaN where
+    parsing fails
+    """
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(values, errors='coerce').astype('float64')
+
+
+def clean_ohlc_chunk(chunk):
+    """
+    Parse one chunk of renamed CSV columns. Returns (clean rows, errors)
+    where clean rows has date, open, high, low, close, volume and percent
+    columns.
+    """
+    cleaned = pd.DataFrame({'date': parse_dates(chunk['date'])}, index=chunk.index)
+    for column in PRICE_COLUMNS:
+        cleaned[column] = parse_numbers(chunk[column])
+    # A blank volume is stored as 0, like the row-by-row importer did
+    cleaned['volume'] = parse_numbers(chunk['volume']).where(chunk['volume'].notna(), 0)
+
+    invalid = cleaned['date'].isna() | cleaned[PRICE_COLUMNS + ['volume']].isna().any(axis=1)
+    errors = [
+        f'Row {idx}: could not parse {", ".join(cleaned.columns[cleaned.loc[idx].isna()])} | Data: {chunk.loc[idx].to_dict()}'
+        for idx in chunk.index[invalid]
+    ]
+    cleaned = cleaned[~invalid]
+    cleaned['volume'] = cleaned['volume'].astype('int64')
+    # Percent is informational; a missing or blank one is stored as 0
+    if 'percent' in chunk.columns:
+        cleaned['percent'] = parse_numbers(chunk['percent'][~invalid]).fillna(0.0)
+    else:
+        cleaned['percent'] = 0.0
+    return cleaned, errors
+
+
+def read_ohlc_chunks(csv_file, chunk_rows=CHUNK_ROWS):
+    """
+    Yield (clean rows, errors) per chunk of `csv_file` (a path or file
+    object). Raises CSVColumnsError if required columns are missing.
+    Row numbers in errors count from 0 across the whole file.
+    """
+    for chunk in pd.read_csv(csv_file, chunksize=chunk_rows):
+        chunk = chunk.rename(columns=COLUMN_MAPPING)
+        missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+        if missing:
+            raise CSVColumnsError(missing)
+        yield clean_ohlc_chunk(chunk)
+
+
+def parse_ohlc_file(path, chunk_rows=CHUNK_ROWS):
+    """
+    Parse a whole CSV file; the symbol is the file name without extension.
+    Returns {'file', 'symbol', 'rows', 'errors', 'failed'} where 'failed'
+    holds the reason the file could not be read at all.
+    Meant to run in a worker process.
+    """
+    name = os.path.basename(path)
+    result = {'file': name, 'symbol': os.path.splitext(name)[0], 'rows': None, 'errors': [], 'failed': None}
+    try:
+        parts = []
+        for rows, errors in read_ohlc_chunks(path, chunk_rows):
+            parts.append(rows)
+            result['errors'].extend(errors)
+    except Exception as e:
+        result['failed'] = str(e)
+        return result
+    rows = pd.concat(parts) if parts else pd.DataFrame(columns=['date', 'open', 'high', 'low', 'close', 'volume', 'percent'])
+    duplicated = rows['date'].duplicated()
+    result['errors'].extend(
+        f'Row {idx}: duplicate date {date}' for idx, date in rows['date'][duplicated].items()
+    )
+    result['rows'] = rows[~duplicated]
+    return result
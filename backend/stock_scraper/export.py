@@ -0,0 +1,121 @@
+"""
+Streaming export of stored OHLC bars as NDJSON or CSV.
+
+Rows are read with a chunked server-side iterator (.iterator()) ordered
+by the (symbol, date) unique index and encoded a chunk at a time, so an
+export of the whole universe holds one chunk in memory whatever the
+table size. The same generators feed the export view
+(StreamingHttpResponse) and the export_ohlc management command.
+"""
+import csv
+import io
+import json
+
+from rest_framework.negotiation import BaseContentNegotiation
+
+from stock_scraper.models import StockOHLC
+
+EXPORT_FIELDS = ('symbol', 'date', 'open', 'high', 'low', 'close', 'volume', 'percent')
+# Rows fetched from the database and encoded per chunk
+EXPORT_CHUNK_ROWS = 5000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def negotiate_export_format(request):
+    """
+    Export format requested with ?format= or the Accept header (NDJSON by
+    default), or None when it is unknown
+    """
+    requested = request.GET.get('format')
+    if requested:
+        return requested if requested in EXPORT_FORMATS else None
+    return 'csv' if 'text/csv' in request.headers.get('Accept', '') else 'ndjson'
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    DRF negotiation for the export view, which picks its own format with
+    negotiate_export_format(); DRF's renderers (JSON) only render errors
+    such as a 401, whatever ?format= or Accept asked for
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def export_negotiation(view):
+    """
+    Decorator for an @api_view function that negotiates its export format
+    itself, the way @permission_classes sets the view's permissions
+    """
+    view.content_negotiation_class = ExportContentNegotiation
+    return view
+
+
+def export_rows(symbols=None, start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Iterate (symbol, date, open, high, low, close, volume, percent) tuples
+    ordered by symbol then date, optionally limited to `symbols` and to
+    dates between `start` and `end` (inclusive)
+    """
+    rows = StockOHLC.objects.order_by('symbol', 'date')
+    if symbols:
+        rows = rows.filter(symbol__in=[symbol.lower() for symbol in symbols])
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+    return rows.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_rows)
+
+
+def _chunks(rows, chunk_rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson(rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    One JSON object per line, yielded as one string per chunk of rows
+    """
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    for chunk in _chunks(rows, chunk_rows):
+        yield ''.join(
+            encode(dict(zip(EXPORT_FIELDS, (symbol, date.isoformat(), *values)))) + '\n'
+            for symbol, date, *values in chunk
+        )
+
+
+def iter_csv(rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    A header line, then one CSV line per row, yielded one chunk at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+    for chunk in _chunks(rows, chunk_rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+
+
+def iter_export(export_format, rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    if export_format == 'ndjson':
+        return iter_ndjson(rows, chunk_rows)
+    if export_format == 'csv':
+        return iter_csv(rows, chunk_rows)
+    raise ValueError(f"Unknown export format: {export_format}")
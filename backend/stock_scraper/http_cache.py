@@ -0,0 +1,85 @@
+"""
+ETag / Last-Modified validators for the market-data views.
+
+Validators come from StockSnapshot, which every ingest refreshes: a
+symbol's latest bar date plus the time it was last ingested. They are
+meant for django.views.decorators.http.condition, which answers
+If-None-Match / If-Modified-Since with a 304 before the view runs.
+"""
+from django.db.models import Count, Max
+
+from stock_scraper.models import StockSnapshot
+
+
+def _universe_state(request):
+    if not hasattr(request, '_stock_universe_state'):
+        request._stock_universe_state = StockSnapshot.objects.aggregate(
+            count=Count('id'), latest_date=Max('date'), updated=Max('updated_at')
+        )
+    return request._stock_universe_state
+
+
+def _symbol_state(request, symbol):
+    if not hasattr(request, '_stock_symbol_state'):
+        request._stock_symbol_state = StockSnapshot.objects.filter(
+            symbol=symbol
+        ).values('date', 'updated_at').first()
+    return request._stock_symbol_state
+
+
+def _query_suffix(request, format_key):
+    # Responses differ by query string and, for views that negotiate one,
+    # by format, so the tag does too. None for an unknown format: the
+    # view answers with an error that should not be tagged
+    suffix = ''
+    if format_key is not None:
+        response_format = format_key(request)
+        if response_format is None:
+            return None
+        suffix = f'-{response_format}'
+    query = request.GET.urlencode()
+    return suffix + (f'?{query}' if query else '')
+
+
+def universe_etag_for(format_key=None):
+    """
+    ETag function over the whole universe; `format_key(request)` names the
+    response format for views that negotiate one
+    """
+    def universe_etag(request, *args, **kwargs):
+        state = _universe_state(request)
+        suffix = _query_suffix(request, format_key)
+        if not state['count'] or suffix is None:
+            return None
+        updated = state['updated'].timestamp()
+        return f"{request.resolver_match.url_name}-{state['count']}-{state['latest_date']}-{updated}{suffix}"
+    return universe_etag
+
+
+universe_etag = universe_etag_for()
+
+
+def universe_last_modified(request, *args, **kwargs):
+    return _universe_state(request)['updated']
+
+
+def symbol_etag_for(format_key=None):
+    """
+    ETag function for one symbol's views, see universe_etag_for()
+    """
+    def symbol_etag(request, symbol, *args, **kwargs):
+        state = _symbol_state(request, symbol)
+        suffix = _query_suffix(request, format_key)
+        if state is None or suffix is None:
+            return None
+        updated = state['updated_at'].timestamp()
+        return f"{request.resolver_match.url_name}-{symbol}-{state['date']}-{updated}{suffix}"
+    return symbol_etag
+
+
+symbol_etag = symbol_etag_for()
+
+
+def symbol_last_modified(request, symbol, *args, **kwargs):
+    state = _symbol_state(request, symbol)
+    return None if state is None else state['updated_at']
@@ -0,0 +1,160 @@
+"""
+Per-symbol incremental indicator state.
+
+A full rebuild runs the vectorized indicators over the whole history and
+stores where each one ended. Appended bars are then folded in from that
+state: EMA needs its last value, Wilder RSI its average gain and loss, and
+moving averages their window sum plus the closes about to leave the window.
+"""
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from stock_scraper.indicators import (
+    STRATEGY_INDICATORS, calculate_indicator, wilder_averages, rsi_from_averages
+)
+from stock_scraper.models import StockOHLC, IndicatorState
+
+# Bars a symbol needs before its state is advanced instead of rebuilt.
+# Shorter histories are cheap to recompute and their RSI seed is not final yet.
+WARMUP_BARS = max(window for _, window in STRATEGY_INDICATORS.values())
+MA_WINDOW = max(
+    [window for kind, window in STRATEGY_INDICATORS.values() if kind == 'ma'], default=0
+)
+
+
+def _load_closes(symbol, **filters):
+    rows = list(
+        StockOHLC.objects.filter(symbol=symbol, **filters)
+        .order_by('date')
+        .values_list('date', 'close')
+    )
+    dates = [row[0] for row in rows]
+    closes = np.array([row[1] for row in rows], dtype=np.float64)
+    return dates, closes
+
+
+def _final(values):
+    value = float(values[-1]) if len(values) else np.nan
+    return None if np.isnan(value) else value
+
+
+@transaction.atomic
+def rebuild_indicator_state(symbol):
+    """
+    Recompute every indicator from the first bar and store the final state.
+
+    Returns (dates, closes, {indicator: values}) for the whole history.
+    """
+    dates, closes = _load_closes(symbol)
+    IndicatorState.objects.filter(symbol=symbol).delete()
+    if not dates:
+        return dates, closes, {}
+
+    values = {}
+    states = []
+    for name, (kind, window) in STRATEGY_INDICATORS.items():
+        state = IndicatorState(
+            symbol=symbol,
+            indicator=name,
+            last_date=dates[-1],
+            bars=len(closes),
+            last_close=float(closes[-1]),
+        )
+        if kind == 'rsi':
+            avg_gain, avg_loss = wilder_averages(closes, window)
+            values[name] = rsi_from_averages(avg_gain, avg_loss)
+            state.avg_gain = _final(avg_gain)
+            state.avg_loss = _final(avg_loss)
+        else:
+            values[name] = calculate_indicator(closes, kind, window)
+            if kind == 'ma':
+                state.window_sum = float(closes[-window:].sum())
+        state.value = _final(values[name])
+        states.append(state)
+
+    IndicatorState.objects.bulk_create(states)
+    return dates, closes, values
+
+
+def _advance(state, kind, window, closes, window_closes):
+    """
+    Fold new closes into one indicator state and return the new values.
+
+    `window_closes` are the closes before the new bars, oldest first, long
+    enough to cover the largest moving average window.
+    """
+    history = list(window_closes)
+    values = []
+    for close in closes:
+        if kind == 'ma':
+            state.window_sum += close - history[-window]
+            state.value = state.window_sum / window
+        elif kind == 'ema':
+            multiplier = 2 / (window + 1)
+            state.value = (close - state.value) * multiplier + state.value
+        elif kind == 'rsi':
+            delta = close - state.last_close
+            gain = delta if delta > 0 else 0.
+            loss = 0. if delta > 0 else -delta
+            state.avg_gain = (state.avg_gain * (window - 1) + gain) / window
+            state.avg_loss = (state.avg_loss * (window - 1) + loss) / window
+            rsi = rsi_from_averages(state.avg_gain, state.avg_loss)
+            state.value = None if np.isnan(rsi) else float(rsi)
+        state.last_close = close
+        history.append(close)
+        values.append(np.nan if state.value is None else state.value)
+    return np.array(values, dtype=np.float64)
+
+
+@transaction.atomic
+def update_indicator_state(symbol):
+    """
+    Fold bars appended since the stored state into it.
+
+    Falls back to a full rebuild when there is no usable state or the stored
+    history no longer matches (bars inserted or removed before the last date).
+    Returns (dates, closes, {indicator: values}, rebuilt) for the bars that
+    were processed; `rebuilt` is True when the whole history was recomputed.
+    """
+    states = {
+        state.indicator: state
+        for state in IndicatorState.objects.select_for_update().filter(symbol=symbol)
+    }
+    if set(states) != set(STRATEGY_INDICATORS):
+        return (*rebuild_indicator_state(symbol), True)
+
+    reference = next(iter(states.values()))
+    if reference.bars < WARMUP_BARS or any(
+        state.last_date != reference.last_date or state.bars != reference.bars
+        for state in states.values()
+    ):
+        return (*rebuild_indicator_state(symbol), True)
+
+    stored_bars = StockOHLC.objects.filter(symbol=symbol, date__lte=reference.last_date).count()
+    if stored_bars != reference.bars:
+        return (*rebuild_indicator_state(symbol), True)
+
+    dates, closes = _load_closes(symbol, date__gt=reference.last_date)
+    if not dates:
+        return dates, closes, {}, False
+
+    window_closes = list(
+        StockOHLC.objects.filter(symbol=symbol, date__lte=reference.last_date)
+        .order_by('-date')
+        .values_list('close', flat=True)[:MA_WINDOW]
+    )[::-1]
+
+    values = {}
+    for name, (kind, window) in STRATEGY_INDICATORS.items():
+        state = states[name]
+        values[name] = _advance(state, kind, window, closes, window_closes)
+        state.last_date = dates[-1]
+        state.bars += len(closes)
+        state.updated_at = timezone.now()
+    IndicatorState.objects.bulk_update(
+        states.values(),
+        ['last_date', 'bars', 'last_close', 'value', 'window_sum', 'avg_gain', 'avg_loss', 'updated_at'],
+    )
+    return dates, closes, values, False
+
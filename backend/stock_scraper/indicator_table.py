@@ -0,0 +1,161 @@
+"""
+Materialized per-day indicators (StockIndicator).
+
+Rows are written in bulk whenever StockOHLC changes: appended bars are
+computed from the incremental IndicatorState, rewritten histories are
+recomputed from the first bar.
+"""
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.dispatch import receiver
+
+from stock_scraper.indicator_state import rebuild_indicator_state, update_indicator_state
+from stock_scraper.indicators import STRATEGY_INDICATORS, optional_float
+from stock_scraper.models import StockOHLC, StockIndicator
+from stock_scraper.signals import ohlc_written
+from stock_scraper.strategies import (
+    GOLDEN_CROSS_START, MA_CROSSOVER_STRATEGIES, crossover_signals, golden_cross_momentum_signals
+)
+
+# StockIndicator field for each indicator column
+INDICATOR_FIELDS = {name: name.lower() for name in STRATEGY_INDICATORS}
+
+
+def _stored(row, field):
+    value = getattr(row, field)
+    return np.nan if value is None else value
+
+
+def _signal_columns(values, start=GOLDEN_CROSS_START, previous_signal=None):
+    """
+    Strategy signal columns for a run of consecutive bars. `start` is the
+    index of the first bar allowed to carry a golden cross momentum signal.
+    `previous_signal` is the stored signal of the first bar, when that bar
+    is an already-stored one carried in for context.
+    """
+    signals = {
+        'signal': golden_cross_momentum_signals(values['MA50'], values['MA200'], values['RSI'], start)
+    }
+    # Without the bar before it, the first bar's crossover cannot be seen again
+    if previous_signal is not None:
+        signals['signal'][0] = previous_signal
+    signals['position'] = np.diff(signals['signal'].astype(np.float64), prepend=np.nan)
+    for key, strategy in MA_CROSSOVER_STRATEGIES.items():
+        signals[f'{key}_signal'] = crossover_signals(
+            values[strategy['short_ma']], values[strategy['long_ma']]
+        )
+    return signals
+
+
+def _build_rows(symbol, dates, closes, values, signals, offset=0):
+    rows = []
+    for i in range(offset, len(dates)):
+        row = StockIndicator(
+            symbol=symbol,
+            date=dates[i],
+            close=float(closes[i]),
+            signal=int(signals['signal'][i]),
+            position=optional_float(signals['position'][i]),
+        )
+        for name, field in INDICATOR_FIELDS.items():
+            setattr(row, field, optional_float(values[name][i]))
+        for key in MA_CROSSOVER_STRATEGIES:
+            setattr(row, f'{key}_signal', int(signals[f'{key}_signal'][i]))
+        rows.append(row)
+    return rows
+
+
+@transaction.atomic
+def rebuild_symbol_indicators(symbol):
+    """
+    Recompute and store every StockIndicator row for a symbol.
+    Returns the number of rows written.
+    """
+    dates, closes, values = rebuild_indicator_state(symbol)
+    return _replace_rows(symbol, dates, closes, values)
+
+
+def _replace_rows(symbol, dates, closes, values):
+    StockIndicator.objects.filter(symbol=symbol).delete()
+    if not dates:
+        return 0
+    rows = _build_rows(symbol, dates, closes, values, _signal_columns(values))
+    StockIndicator.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+@transaction.atomic
+def update_symbol_indicators(symbol):
+    """
+    Store StockIndicator rows for bars appended since the last ingest.
+    Returns the number of rows written.
+    """
+    last_row = StockIndicator.objects.filter(symbol=symbol).order_by('-date').first()
+    if last_row is None:
+        return rebuild_symbol_indicators(symbol)
+
+    dates, closes, values, rebuilt = update_indicator_state(symbol)
+    if rebuilt:
+        return _replace_rows(symbol, dates, closes, values)
+    if not dates:
+        return 0
+
+    # The table must hold exactly the bars before the new ones
+    ohlc = StockOHLC.objects.filter(symbol=symbol)
+    previous_bars = ohlc.filter(date__lte=last_row.date).count()
+    if (previous_bars != StockIndicator.objects.filter(symbol=symbol).count()
+            or ohlc.filter(date__gt=last_row.date).count() != len(dates)):
+        return rebuild_symbol_indicators(symbol)
+
+    # Prepend the last stored bar so crossovers into the first new bar are seen
+    dates = [last_row.date] + list(dates)
+    closes = np.concatenate([[last_row.close], closes])
+    values = {
+        name: np.concatenate([[_stored(last_row, field)], values[name]])
+        for name, field in INDICATOR_FIELDS.items()
+    }
+    start = GOLDEN_CROSS_START - (previous_bars - 1)
+    signals = _signal_columns(values, start, previous_signal=last_row.signal)
+
+    rows = _build_rows(symbol, dates, closes, values, signals, offset=1)
+    StockIndicator.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def load_symbol_indicators(symbol, columns, required, limit=None, start=None, end=None):
+    """
+    StockIndicator rows with every `required` field set, oldest first, as a
+    DataFrame indexed by date. Only rows between `start` and `end` (inclusive,
+    when given) are read, and of those only the latest `limit`.
+
+    Symbols with OHLC data but no materialized rows yet are built on demand.
+    Returns None when the symbol has no OHLC data at all.
+    """
+    queryset = StockIndicator.objects.filter(symbol=symbol)
+    if not queryset.exists():
+        if not StockOHLC.objects.filter(symbol=symbol).exists():
+            return None
+        rebuild_symbol_indicators(symbol)
+
+    filters = {f'{field}__isnull': False for field in required}
+    if start is not None:
+        filters['date__gte'] = start
+    if end is not None:
+        filters['date__lte'] = end
+    rows = queryset.filter(**filters).order_by('-date').values('date', *columns)
+    if limit is not None:
+        rows = rows[:limit]
+    rows = list(rows)[::-1]
+    df = pd.DataFrame.from_records(rows, columns=['date', *columns])
+    df['date'] = pd.to_datetime(df['date'])
+    return df.set_index('date')
+
+
+@receiver(ohlc_written)
+def refresh_symbol_indicators(sender, symbols, replaced=False, **kwargs):
+    for symbol in symbols:
+        if replaced:
+            rebuild_symbol_indicators(symbol)
+        else:
+            update_symbol_indicators(symbol)
@@ -0,0 +1,259 @@
+"""
+Vectorized technical indicators.
+
+Every function accepts a 1-D array of prices (one symbol) or a 2-D array
+shaped (symbols x days) and works along the last axis. Shorter histories in
+a 2-D array can be left-padded with NaN; each row starts at its first valid
+price. Positions without enough history are NaN.
+"""
+import numpy as np
+import pandas as pd
+
+
+def optional_float(value):
+    """
+    `value` as a float, or None for NaN (JSON has no NaN)
+    """
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _as_2d(prices):
+    values = np.asarray(prices, dtype=np.float64)
+    if values.ndim == 1:
+        return values[np.newaxis, :], True
+    if values.ndim != 2:
+        raise ValueError("prices must be a 1-D or 2-D array")
+    return values, False
+
+
+def _restore(values, squeeze):
+    return values[0] if squeeze else values
+
+
+def first_valid_index(values):
+    """
+    Index of the first non-NaN value in each row (row length if none)
+    """
+    valid = ~np.isnan(values)
+    first = np.argmax(valid, axis=1)
+    first[~valid.any(axis=1)] = values.shape[1]
+    return first
+
+
+def _ewm(values, alpha):
+    """
+    Recursive filter y[t] = alpha * x[t] + (1 - alpha) * y[t-1] along each row,
+    started at the first non-NaN value of the row.
+    """
+    if values.shape[1] == 0:
+        return values.copy()
+    frame = pd.DataFrame(values.T)
+    return frame.ewm(alpha=alpha, adjust=False).mean().to_numpy().T
+
+
+def _rolling_sum(values, window):
+    """
+    Rolling sum over `window` values and the count of valid values in it
+    """
+    rows, days = values.shape
+    filled = np.where(np.isnan(values), 0.0, values)
+    csum = np.zeros((rows, days + 1))
+    np.cumsum(filled, axis=1, out=csum[:, 1:])
+    count = np.zeros((rows, days + 1))
+    np.cumsum(~np.isnan(values), axis=1, out=count[:, 1:])
+
+    sums = np.full((rows, days), np.nan)
+    counts = np.zeros((rows, days))
+    if window <= days:
+        sums[:, window - 1:] = csum[:, window:] - csum[:, :-window]
+        counts[:, window - 1:] = count[:, window:] - count[:, :-window]
+    return sums, counts
+
+
+def calculate_ma(prices, window):
+    """
+    Calculate Simple Moving Average from a cumulative sum
+    """
+    values, squeeze = _as_2d(prices)
+    sums, counts = _rolling_sum(values, window)
+    ma = np.where(counts == window, sums / window, np.nan)
+    return _restore(ma, squeeze)
+
+
+def rolling_means(prices, windows):
+    """
+    Simple Moving Averages for several windows from one cumulative sum.
+    Returns an array with a leading windows axis: (windows, ...prices shape)
+    """
+    values, squeeze = _as_2d(prices)
+    rows, days = values.shape
+    windows = np.asarray(windows)
+    filled = np.where(np.isnan(values), 0.0, values)
+    csum = np.zeros((rows, days + 1))
+    np.cumsum(filled, axis=1, out=csum[:, 1:])
+    count = np.zeros((rows, days + 1))
+    np.cumsum(~np.isnan(values), axis=1, out=count[:, 1:])
+
+    # Window k ending at day t sums positions t - windows[k] + 1 .. t
+    ends = np.arange(1, days + 1)
+    starts = ends[np.newaxis, :] - windows[:, np.newaxis]
+    complete = starts >= 0
+    starts = np.maximum(starts, 0)
+    sums = csum[:, ends][np.newaxis] - csum[:, starts].transpose(1, 0, 2)
+    counts = count[:, ends][np.newaxis] - count[:, starts].transpose(1, 0, 2)
+    means = np.where(
+        complete[:, np.newaxis, :] & (counts == windows[:, np.newaxis, np.newaxis]),
+        sums / windows[:, np.newaxis, np.newaxis],
+        np.nan,
+    )
+    return means[:, 0] if squeeze else means
+
+
+def calculate_ema(prices, window):
+    """
+    Calculate Exponential Moving Average, seeded with the SMA of the first window
+    """
+    values, squeeze = _as_2d(prices)
+    rows, days = values.shape
+    seed_at = first_valid_index(values) + window - 1
+    ma = calculate_ma(values, window)
+
+    columns = np.arange(days)
+    seeded = np.where(columns < seed_at[:, np.newaxis], np.nan, values)
+    has_seed = seed_at < days
+    seeded[has_seed, seed_at[has_seed]] = ma[has_seed, seed_at[has_seed]]
+
+    ema = _ewm(seeded, 2 / (window + 1))
+    return _restore(ema, squeeze)
+
+
+def wilder_averages(prices, period=14):
+    """
+    Wilder-smoothed average gain and loss used by RSI.
+
+    The seed averages the first period + 1 price changes and covers the first
+    `period` bars; later bars are smoothed with alpha = 1 / period.
+    """
+    values, squeeze = _as_2d(prices)
+    rows, days = values.shape
+    if days < 2:
+        empty = np.full((rows, days), np.nan)
+        return _restore(empty, squeeze), _restore(empty.copy(), squeeze)
+
+    deltas = np.diff(values, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas > 0, 0.0, -deltas)
+    gains[np.isnan(deltas)] = np.nan
+    losses[np.isnan(deltas)] = np.nan
+
+    first = first_valid_index(values)
+    last_delta = days - 2
+    seed_end = np.minimum(first + period, last_delta)
+    seed_at = np.minimum(first + period - 1, days - 1)
+
+    averages = []
+    for changes in (gains, losses):
+        csum = np.zeros((rows, days))
+        np.cumsum(np.nan_to_num(changes), axis=1, out=csum[:, 1:])
+        start = np.minimum(first, days - 1)
+        seed = (csum[np.arange(rows), seed_end + 1] - csum[np.arange(rows), start]) / period
+
+        # shifted[:, i] holds the change that moves bar i - 1 to bar i
+        shifted = np.empty((rows, days))
+        shifted[:, 0] = np.nan
+        shifted[:, 1:] = changes
+        columns = np.arange(days)
+        shifted[columns < seed_at[:, np.newaxis]] = np.nan
+        has_seed = first < days - 1
+        shifted[has_seed, seed_at[has_seed]] = seed[has_seed]
+
+        smoothed = _ewm(shifted, 1 / period)
+        warmup = (columns >= first[:, np.newaxis]) & (columns < seed_at[:, np.newaxis])
+        smoothed = np.where(warmup, seed[:, np.newaxis], smoothed)
+        averages.append(_restore(smoothed, squeeze))
+    return averages[0], averages[1]
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """
+    Turn Wilder average gain and loss into RSI values
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.asarray(avg_gain) / np.asarray(avg_loss)
+        return 100. - 100. / (1. + rs)
+
+
+def calculate_rsi(prices, period=14):
+    """
+    Calculate Relative Strength Index (RSI) with Wilder smoothing
+    """
+    avg_gain, avg_loss = wilder_averages(prices, period)
+    return rsi_from_averages(avg_gain, avg_loss)
+
+
+# Indicator columns used by the strategy views, as (kind, window)
+STRATEGY_INDICATORS = {
+    'MA50': ('ma', 50),
+    'MA200': ('ma', 200),
+    'EMA9': ('ema', 9),
+    'EMA21': ('ema', 21),
+    'EMA20': ('ema', 20),
+    'EMA50': ('ema', 50),
+    'RSI': ('rsi', 14),
+}
+
+
+def calculate_indicator(prices, kind, window):
+    """
+    Calculate one indicator by kind ('ma', 'ema' or 'rsi')
+    """
+    if kind == 'ma':
+        return calculate_ma(prices, window)
+    if kind == 'ema':
+        return calculate_ema(prices, window)
+    if kind == 'rsi':
+        return calculate_rsi(prices, window)
+    raise ValueError(f"Unknown indicator kind: {kind}")
+
+
+def calculate_strategy_indicators(prices):
+    """
+    Calculate every indicator in STRATEGY_INDICATORS
+    """
+    return {
+        name: calculate_indicator(prices, kind, window)
+        for name, (kind, window) in STRATEGY_INDICATORS.items()
+    }
+
+
+def latest_volatility(prices, lookback_days=30):
+    """
+    Annualized volatility (in percent) of log returns over the last
+    `lookback_days` prices, NaN when fewer than two returns are available
+    """
+    values, squeeze = _as_2d(prices)
+    window = values[:, -lookback_days:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(window[:, 1:] / window[:, :-1])
+    returns[~(window[:, :-1] > 0)] = np.nan
+
+    count = (~np.isnan(returns)).sum(axis=1)
+    mean = np.nansum(returns, axis=1) / np.maximum(count, 1)
+    squares = np.nansum((returns - mean[:, np.newaxis]) ** 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.sqrt(squares / (count - 1)) * np.sqrt(252) * 100
+    volatility[count < 2] = np.nan
+    return _restore(volatility, squeeze)
+
+
+def max_drawdown(closes):
+    """
+    Largest peak-to-trough fall over the whole history, in percent (<= 0)
+    """
+    peaks = np.fmax.accumulate(closes, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, closes / peaks - 1, np.nan)
+    worst = np.nan_to_num(drawdowns, nan=0.0).min(axis=1)
+    worst[np.isnan(drawdowns).all(axis=1)] = np.nan
+    return worst * 100
@@ -0,0 +1,153 @@
+"""
+Bulk loading of parsed OHLC CSV rows into StockOHLC.
+"""
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from stock_scraper.csv_parsing import CHUNK_ROWS, read_ohlc_chunks
+from stock_scraper.models import Investment, StockOHLC
+
+BATCH_SIZE = 2000
+# Fields an upsert compares and overwrites; percent is only set on insert
+UPSERT_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class _NothingImported(Exception):
+    pass
+
+
+def _ohlc_objects(symbol, rows):
+    return [
+        StockOHLC(symbol=symbol, date=date, open=open_, high=high, low=low,
+                  close=close, volume=volume, percent=percent)
+        for date, open_, high, low, close, volume, percent in zip(
+            rows['date'], rows['open'], rows['high'], rows['low'],
+            rows['close'], rows['volume'].tolist(), rows['percent'],
+        )
+    ]
+
+
+def insert_new_ohlc(symbol, rows, batch_size=BATCH_SIZE):
+    """
+    Insert `rows` for `symbol` in batches, skipping dates already stored.
+    Returns how many rows were new.
+    """
+    existing = StockOHLC.objects.filter(symbol=symbol)
+    before = existing.count()
+    for start in range(0, len(rows), batch_size):
+        StockOHLC.objects.bulk_create(
+            _ohlc_objects(symbol, rows.iloc[start:start + batch_size]), ignore_conflicts=True
+        )
+    return existing.count() - before
+
+
+def upsert_symbol_ohlc(symbol, rows, batch_size=BATCH_SIZE):
+    """
+    Insert bars for new dates and overwrite stored bars whose prices or
+    volume differ, in one transaction. Existing bars are compared in bulk
+    and identical ones are not written.
+
+    Returns {'inserted', 'updated', 'unchanged', 'rewrote_history'} where
+    rewrote_history is True when a bar at or before the previously
+    latest date was inserted or changed.
+    """
+    if rows.empty:
+        return {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rewrote_history': False}
+    existing = pd.DataFrame.from_records(
+        StockOHLC.objects.filter(symbol=symbol, date__gte=rows['date'].min(), date__lte=rows['date'].max())
+        .values_list('date', *UPSERT_FIELDS),
+        columns=['date', *[f'{field}_stored' for field in UPSERT_FIELDS]],
+    )
+    merged = rows.merge(existing, on='date', how='left', indicator=True)
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    differs = np.zeros(len(merged), dtype=bool)
+    for field in UPSERT_FIELDS:
+        differs |= merged[field].to_numpy(dtype=np.float64) != merged[f'{field}_stored'].to_numpy(dtype=np.float64)
+    is_changed = differs & ~is_new
+
+    latest = StockOHLC.objects.filter(symbol=symbol).order_by('-date').values_list('date', flat=True).first()
+    written = merged.loc[is_new | is_changed, rows.columns]
+    with transaction.atomic():
+        for start in range(0, len(written), batch_size):
+            StockOHLC.objects.bulk_create(
+                _ohlc_objects(symbol, written.iloc[start:start + batch_size]),
+                update_conflicts=True,
+                unique_fields=['symbol', 'date'],
+                update_fields=UPSERT_FIELDS,
+            )
+
+    return {
+        'inserted': int(is_new.sum()),
+        'updated': int(is_changed.sum()),
+        'unchanged': int((~is_new & ~is_changed).sum()),
+        'rewrote_history': latest is not None and bool((written['date'] <= latest).any()),
+    }
+
+
+def _delete_stale_bars(symbol, kept_dates, batch_size):
+    """
+    Delete the bars of `symbol` on dates not in `kept_dates`. Investments
+    referencing one of them are first repointed at the symbol's latest
+    kept bar, so replacing history never cascades to holdings. Returns
+    how many bars were deleted.
+    """
+    stale = [
+        pk for pk, date in StockOHLC.objects.filter(symbol=symbol).values_list('id', 'date').iterator()
+        if date not in kept_dates
+    ]
+    if not stale:
+        return 0
+    latest = StockOHLC.objects.filter(symbol=symbol, date=max(kept_dates)).values_list('id', flat=True).get()
+    deleted = 0
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        Investment.objects.filter(stock_id__in=batch).update(stock_id=latest)
+        _, per_model = StockOHLC.objects.filter(id__in=batch).delete()
+        deleted += per_model.get(StockOHLC._meta.label, 0)
+    return deleted
+
+
+def replace_symbol_ohlc(symbol, csv_file, chunk_rows=CHUNK_ROWS, batch_size=BATCH_SIZE, progress=None):
+    """
+    Replace the bars of `symbol` with the rows of `csv_file` in one
+    transaction: bars are updated in place (keeping their ids, so
+    investments still point at them), bars on dates missing from the file
+    are deleted last, and nothing changes if the file fails or no row
+    parses. `progress(result)` is called after every chunk.
+
+    Returns {'attempted', 'deleted_count', 'records_created', 'errors'},
+    where deleted_count counts StockOHLC rows only.
+    """
+    result = {'attempted': 0, 'deleted_count': 0, 'records_created': 0, 'errors': []}
+    try:
+        with transaction.atomic():
+            seen_dates = set()
+            for rows, errors in read_ohlc_chunks(csv_file, chunk_rows):
+                result['attempted'] += len(rows) + len(errors)
+                result['errors'].extend(errors)
+
+                duplicated = rows['date'].isin(seen_dates) | rows['date'].duplicated()
+                result['errors'].extend(
+                    f'Row {idx}: duplicate date {date}' for idx, date in rows['date'][duplicated].items()
+                )
+                rows = rows[~duplicated]
+                seen_dates.update(rows['date'])
+
+                StockOHLC.objects.bulk_create(
+                    _ohlc_objects(symbol, rows),
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=['symbol', 'date'],
+                    update_fields=[*UPSERT_FIELDS, 'percent'],
+                )
+                result['records_created'] += len(rows)
+                if progress is not None:
+                    progress(result)
+
+            if not result['records_created']:
+                raise _NothingImported
+            result['deleted_count'] = _delete_stale_bars(symbol, seen_dates, batch_size)
+    except _NothingImported:
+        pass
+    return result
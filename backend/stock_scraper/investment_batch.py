@@ -0,0 +1,206 @@
+"""
+Batch import and batch close of investments.
+
+Records (a JSON list or a broker CSV) are validated column-wise with
+pandas, so every problem in the batch is reported at once. Symbols and
+investment ids are resolved with one query each, and the batch is
+written with bulk_create / bulk_update in a single transaction: either
+every record is applied or none is.
+"""
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from stock_scraper.indicators import optional_float
+from stock_scraper.models import Investment, StockOHLC
+
+# Largest batch one request may import or update
+MAX_BATCH_RECORDS = 5000
+BATCH_SIZE = 1000
+IMPORT_COLUMNS = ['stock', 'buy_price', 'quantity', 'buy_date', 'sell_price', 'sell_date']
+UPDATE_COLUMNS = ['id', 'sell_price', 'sell_date']
+# Broker exports name the columns differently
+COLUMN_ALIASES = {
+    'symbol': 'stock',
+    'ticker': 'stock',
+    'price': 'buy_price',
+    'qty': 'quantity',
+    'shares': 'quantity',
+    'date': 'buy_date',
+}
+
+
+class BatchValidationError(ValueError):
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid record(s)')
+        self.errors = errors
+
+
+def records_frame(records, columns):
+    """
+    DataFrame of `records` (a list of dicts or a CSV file object) with
+    normalized column names; missing optional columns are left blank
+    """
+    if hasattr(records, 'read'):
+        try:
+            frame = pd.read_csv(records, dtype=str, skipinitialspace=True)
+        except pd.errors.EmptyDataError:
+            raise BatchValidationError(['No records to process'])
+        except (pd.errors.ParserError, UnicodeDecodeError):
+            raise BatchValidationError(['Could not read the file as CSV'])
+    else:
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise BatchValidationError(['Expected a list of records'])
+        frame = pd.DataFrame.from_records(records)
+    frame = frame.rename(columns=lambda column: str(column).strip().lower().replace(' ', '_'))
+    frame = frame.rename(columns={alias: name for alias, name in COLUMN_ALIASES.items() if name not in frame.columns})
+    if frame.empty:
+        raise BatchValidationError(['No records to process'])
+    if len(frame) > MAX_BATCH_RECORDS:
+        raise BatchValidationError([f'At most {MAX_BATCH_RECORDS} records can be processed at once'])
+    for column in columns:
+        if column not in frame.columns:
+            frame[column] = None
+    # Report rows counting from 1, the way a spreadsheet shows them
+    frame.index = pd.RangeIndex(1, len(frame) + 1)
+    return frame[columns]
+
+
+def _blank(values):
+    return values.isna() | (values.astype(str).str.strip() == '')
+
+
+def _dates(values):
+    return pd.to_datetime(values.where(~_blank(values)), format='%Y-%m-%d', errors='coerce')
+
+
+def _numbers(values):
+    return pd.to_numeric(values.where(~_blank(values)), errors='coerce').astype('float64')
+
+
+def _row_errors(problems):
+    """
+    'Row N: ...' messages from {message: boolean Series}, in row order
+    """
+    errors = []
+    for message, mask in problems.items():
+        errors.extend((row, f'Row {row}: {message}') for row in mask.index[mask.to_numpy()])
+    return [error for _, error in sorted(errors, key=lambda error: error[0])]
+
+
+def _sale_columns(frame, problems):
+    sell_price = _numbers(frame['sell_price'])
+    sell_date = _dates(frame['sell_date'])
+    problems['invalid sell price'] = ~_blank(frame['sell_price']) & ~(sell_price > 0)
+    problems['invalid sell date format, use YYYY-MM-DD'] = ~_blank(frame['sell_date']) & sell_date.isna()
+    return sell_price, sell_date
+
+
+def _total_pl(buy_price, quantity, sell_price):
+    # Same rule as Investment.calculate_pl(): only sold lots have a P&L
+    return np.where(np.isnan(sell_price), np.nan, (sell_price - buy_price) * quantity)
+
+
+def latest_bars(symbols):
+    """
+    {symbol: latest StockOHLC row} for `symbols`, in one query
+    """
+    latest_date = StockOHLC.objects.filter(symbol=OuterRef('symbol')).order_by('-date').values('date')[:1]
+    bars = StockOHLC.objects.filter(symbol__in=list(symbols), date=Subquery(latest_date)).only('id', 'symbol')
+    return {bar.symbol: bar for bar in bars}
+
+
+def import_investments(user, records):
+    """
+    Create one Investment per record for `user`. Records need stock,
+    buy_price, quantity and buy_date and may carry sell_price and
+    sell_date for lots already closed. Raises BatchValidationError with
+    every problem found; otherwise returns the created investments.
+    """
+    frame = records_frame(records, IMPORT_COLUMNS)
+    problems = {}
+    symbols = frame['stock'].where(~_blank(frame['stock'])).astype('string').str.strip().str.lower()
+    buy_price = _numbers(frame['buy_price'])
+    quantity = _numbers(frame['quantity'])
+    buy_date = _dates(frame['buy_date'])
+
+    bars = latest_bars(symbols.dropna().unique())
+    problems['stock is required'] = symbols.isna()
+    problems['unknown stock'] = symbols.notna() & ~symbols.isin(list(bars))
+    problems['buy price must be greater than 0'] = ~(buy_price > 0)
+    problems['quantity must be a positive whole number'] = ~(quantity > 0) | (quantity % 1 != 0)
+    problems['invalid buy date format, use YYYY-MM-DD'] = buy_date.isna()
+    sell_price, sell_date = _sale_columns(frame, problems)
+    problems['sell date is before buy date'] = (sell_date < buy_date).fillna(False)
+    errors = _row_errors(problems)
+    if errors:
+        raise BatchValidationError(errors)
+
+    total_pl = _total_pl(buy_price.to_numpy(), quantity.to_numpy(), sell_price.to_numpy())
+    investments = [
+        Investment(
+            user=user, stock=bars[symbol], buy_price=price, quantity=int(count), buy_date=bought.date(),
+            sell_price=optional_float(sold_at), sell_date=None if pd.isna(sold) else sold.date(), total_pl=optional_float(pl),
+        )
+        for symbol, price, count, bought, sold_at, sold, pl in zip(
+            symbols, buy_price, quantity, buy_date, sell_price, sell_date, total_pl
+        )
+    ]
+    with transaction.atomic():
+        return Investment.objects.bulk_create(investments, batch_size=BATCH_SIZE)
+
+
+def close_investments(user, records):
+    """
+    Set sell_price and/or sell_date on `user`'s open investments (no sell
+    price yet), one record per investment id, and recompute total_pl.
+    Raises BatchValidationError with every problem found; otherwise
+    returns the updated investments.
+    """
+    frame = records_frame(records, UPDATE_COLUMNS)
+    problems = {}
+    ids = _numbers(frame['id'])
+    sell_price, sell_date = _sale_columns(frame, problems)
+
+    valid_id = (ids > 0) & (ids % 1 == 0)
+    investments = Investment.objects.filter(user=user).select_related('stock').in_bulk(
+        ids[valid_id].astype('int64').unique().tolist()
+    )
+    problems['invalid investment ID'] = ~valid_id
+    problems['investment not found'] = valid_id & ~ids.isin(list(investments))
+    problems['duplicate investment ID'] = valid_id & ids.duplicated(keep=False)
+    sold = [key for key, investment in investments.items() if investment.sell_price is not None]
+    problems['investment already sold'] = valid_id & ids.isin(sold)
+    problems['nothing to update, give sell_price or sell_date'] = _blank(frame['sell_price']) & _blank(frame['sell_date'])
+    buy_date = pd.to_datetime(ids.map({key: investment.buy_date for key, investment in investments.items()}))
+    problems['sell date is before buy date'] = (sell_date < buy_date).fillna(False)
+    errors = _row_errors(problems)
+    if errors:
+        raise BatchValidationError(errors)
+
+    now = timezone.now()
+    updated = []
+    for investment_id, price, sold in zip(ids.astype('int64'), sell_price, sell_date):
+        investment = investments[investment_id]
+        if not pd.isna(price):
+            investment.sell_price = float(price)
+        if not pd.isna(sold):
+            investment.sell_date = sold.date()
+        investment.updated_at = now
+        updated.append(investment)
+
+    total_pl = _total_pl(
+        np.array([investment.buy_price for investment in updated], dtype=np.float64),
+        np.array([investment.quantity for investment in updated], dtype=np.float64),
+        np.array([np.nan if investment.sell_price is None else investment.sell_price for investment in updated]),
+    )
+    for investment, pl in zip(updated, total_pl):
+        if not np.isnan(pl):
+            investment.total_pl = float(pl)
+    with transaction.atomic():
+        Investment.objects.bulk_update(
+            updated, ['sell_price', 'sell_date', 'total_pl', 'updated_at'], batch_size=BATCH_SIZE
+        )
+    return updated
@@ -0,0 +1,143 @@
+"""
+Background ingest jobs for admin CSV uploads.
+
+An upload is saved under settings.INGEST_UPLOAD_DIR and imported by a
+small thread pool inside the web process (settings.INGEST_JOB_WORKERS,
+default 1 so imports do not fight over the database write lock). There
+is no broker: the IngestJob row is both the queue entry and the result.
+
+While a job runs its progress goes to the Django cache, because the
+import's own writes only become visible when its transaction commits.
+With a cache shared between processes every web worker can report it;
+with the default local-memory cache only the one running the job can.
+Jobs are not persisted across restarts: a restart abandons them.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from backend import metrics
+from stock_scraper.ingest import replace_symbol_ohlc
+from stock_scraper.models import IngestJob
+from stock_scraper.signals import ohlc_written
+
+# Row errors kept on the job; the rest are only counted
+MAX_STORED_ERRORS = 500
+PROGRESS_TIMEOUT = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def upload_storage():
+    return FileSystemStorage(location=getattr(settings, 'INGEST_UPLOAD_DIR', settings.BASE_DIR / 'ingest_uploads'))
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'INGEST_JOB_WORKERS', 1), thread_name_prefix='ingest'
+            )
+        return _executor
+
+
+def _progress_key(job_id):
+    return f'stock_scraper:ingest_job:{job_id}:progress'
+
+
+def queue_ingest_job(symbol, csv_file, user=None):
+    """
+    Save `csv_file` and queue it to replace the bars of `symbol`
+    """
+    file_name = upload_storage().save(f'{symbol}-{uuid.uuid4().hex}.csv', csv_file)
+    job = IngestJob.objects.create(symbol=symbol, file_name=file_name, created_by=user)
+    transaction.on_commit(lambda: _get_executor().submit(run_ingest_job, job.pk))
+    return job
+
+
+def job_progress(job):
+    """
+    Live counters for a running job, or None
+    """
+    if job.status != 'running':
+        return None
+    return cache.get(_progress_key(job.pk))
+
+
+def _refresh_derived_data(job):
+    """
+    Send ohlc_written for the committed import. A failing receiver leaves
+    the bars imported (the job still succeeds) and is reported as a
+    warning appended to the job message, or '' when all receivers ran.
+    """
+    failed = []
+    for receiver, response in ohlc_written.send_robust(sender=run_ingest_job, symbols=[job.symbol], replaced=True):
+        if isinstance(response, Exception):
+            logger.error('Error in %s after ingest job %s', receiver.__qualname__, job.pk, exc_info=response)
+            failed.append(f'{receiver.__qualname__}: {str(response)}')
+    if not failed:
+        return ''
+    return f" Warning: derived data was not refreshed ({'; '.join(failed)})."
+
+
+def run_ingest_job(job_id):
+    job = IngestJob.objects.get(pk=job_id)
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    def progress(result):
+        cache.set(_progress_key(job_id), {
+            'rows_processed': result['attempted'],
+            'records_created': result['records_created'],
+            'error_count': len(result['errors']),
+        }, PROGRESS_TIMEOUT)
+
+    storage = upload_storage()
+    started = time.perf_counter()
+    try:
+        with storage.open(job.file_name, 'rb') as csv_file:
+            result = replace_symbol_ohlc(job.symbol, csv_file, progress=progress)
+        metrics.observe_ingest('admin_upload', result['records_created'], time.perf_counter() - started)
+
+        job.rows_processed = result['attempted']
+        job.records_created = result['records_created']
+        job.deleted_count = result['deleted_count']
+        job.error_count = len(result['errors'])
+        job.errors = result['errors'][:MAX_STORED_ERRORS]
+        if result['attempted'] == 0:
+            job.status = 'failed'
+            job.message = 'No rows found in CSV.'
+        elif result['records_created'] == 0:
+            job.status = 'failed'
+            job.message = f'No new records added for {job.symbol}. All rows failed to insert; existing records were kept.'
+        else:
+            job.status = 'succeeded'
+            job.message = (
+                f"Successfully deleted {result['deleted_count']} old records and added "
+                f"{result['records_created']} new records for {job.symbol}."
+            )
+            job.message += _refresh_derived_data(job)
+    except Exception as e:
+        logger.exception('Fatal error in ingest job %s', job_id)
+        job.status = 'failed'
+        job.message = f'Error processing file: {str(e)}'
+    finally:
+        job.finished_at = timezone.now()
+        job.save()
+        cache.delete(_progress_key(job_id))
+        storage.delete(job.file_name)
+        # Worker threads do not go through request_finished, so close here
+        connection.close()
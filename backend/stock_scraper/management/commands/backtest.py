@@ -0,0 +1,74 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from stock_scraper.backtest import backtest_universe, backtest_workers
+from stock_scraper.backtest_engine import BACKTEST_STRATEGIES
+
+class Command(BaseCommand):
+    help = 'Backtest the strategy signals on every symbol'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strategy',
+            action='append',
+            choices=list(BACKTEST_STRATEGIES),
+            help='Strategy to backtest (repeatable, default: all)'
+        )
+        parser.add_argument(
+            '--symbol',
+            action='append',
+            help='Symbol to backtest (repeatable, default: all)'
+        )
+        parser.add_argument(
+            '--cost-bps',
+            type=float,
+            default=0.0,
+            help='Cost per position change in basis points'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processes to split the symbols across (default: BACKTEST_WORKERS or one per CPU)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the full per-symbol report to this JSON file'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or backtest_workers()
+        started = time.perf_counter()
+        report = backtest_universe(
+            symbols=options['symbol'],
+            strategies=options['strategy'],
+            cost_bps=options['cost_bps'],
+            workers=workers,
+        )
+        elapsed = time.perf_counter() - started
+        if not report:
+            raise CommandError('No OHLC data to backtest.')
+
+        def percent(value):
+            return '-' if value is None else f'{value:.1f}%'
+
+        for key, strategy in report.items():
+            summary = strategy['summary']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{strategy['name']} ({key})"))
+            self.stdout.write(
+                f"  {summary['symbols_traded']}/{summary['symbols']} symbols traded, {summary['trades']} trades, "
+                f"hit rate {percent(summary['hit_rate'])}"
+            )
+            self.stdout.write(
+                f"  median return {percent(summary['median_total_return'])} "
+                f"(buy and hold {percent(summary['median_buy_and_hold_return'])}), "
+                f"median max drawdown {percent(summary['median_max_drawdown'])}, "
+                f"median turnover {summary['median_turnover'] or 0:.1f}/year"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Full report written to {options['output']}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Backtested {len(report)} strategies with {workers} process(es) in {elapsed:.1f}s."))
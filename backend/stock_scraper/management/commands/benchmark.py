@@ -0,0 +1,109 @@
+import json
+import tempfile
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import Admin
+from stock_scraper.benchmark import (
+    create_investments,
+    environment,
+    load_universe,
+    run_benchmarks,
+    time_call,
+)
+from stock_scraper.models import StockOHLC
+from stock_scraper.signals import ohlc_written
+
+class Command(BaseCommand):
+    help = 'Time indicators, market-data views and CSV ingest on a synthetic universe in a test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--symbols', type=int, default=1000, help='Synthetic symbols to generate')
+        parser.add_argument('--years', type=int, default=20, help='Years of daily bars per symbol')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic universe')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark')
+        parser.add_argument('--csv-files', type=int, default=5, help='Files in the seed_stocks --folder benchmark')
+        parser.add_argument('--investments', type=int, default=200, help='Investments held by the benchmark user')
+        parser.add_argument('--output', type=str, default='benchmark.json', help='Where to write the JSON results')
+        parser.add_argument('--compare', type=str, help='Earlier results JSON to compare medians against')
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the test database between runs and reuse a universe of the same size. '
+                 'SQLite test databases are in memory unless DATABASES TEST NAME is set, '
+                 'so with the default settings this has no effect'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            with tempfile.TemporaryDirectory() as workdir, \
+                    override_settings(STOCK_COLUMNAR_STORE_DIR=f'{workdir}/columnar_store',
+                                      INGEST_UPLOAD_DIR=f'{workdir}/ingest_uploads'):
+                report = self.run(options, workdir)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+
+        baseline = {}
+        if options['compare']:
+            with open(options['compare']) as previous:
+                baseline = json.load(previous)['results']
+
+        for name, timings in report['results'].items():
+            line = f"{name:<36} median {timings['median'] * 1000:10.2f} ms  (min {timings['min'] * 1000:.2f} ms)"
+            if name in baseline:
+                line += f"  {baseline[name]['median'] / timings['median']:.2f}x vs baseline"
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f"✅ Benchmark results written to {options['output']}"))
+
+    def run(self, options, workdir):
+        expected_bars = options['symbols'] * options['years'] * 252
+        setup = {}
+        if StockOHLC.objects.filter(symbol__startswith='syn').count() != expected_bars:
+            StockOHLC.objects.all().delete()
+            self.stdout.write(f"Generating {options['symbols']} symbols x {options['years']} years...")
+            setup['load_universe'] = time_call(
+                lambda: load_universe(options['symbols'], options['years'], options['seed']), 1
+            )
+        else:
+            # Derived data lives outside the database, so rebuild it for the fresh store directory
+            symbols = list(StockOHLC.objects.order_by('symbol').values_list('symbol', flat=True).distinct())
+            ohlc_written.send(sender=self.__class__, symbols=symbols, replaced=True)
+
+        admin_user, _ = User.objects.get_or_create(username='benchmark-admin')
+        Admin.objects.get_or_create(user=admin_user)
+        user, created = User.objects.get_or_create(username='benchmark-user')
+        if created:
+            create_investments(user, 'syn0000', options['investments'])
+
+        self.stdout.write("Running benchmarks...")
+        results = run_benchmarks(
+            'syn0000',
+            admin_token=str(RefreshToken.for_user(admin_user).access_token),
+            user_token=str(RefreshToken.for_user(user).access_token),
+            workdir=workdir,
+            repeat=options['repeat'],
+            csv_files=options['csv_files'],
+            years=options['years'],
+            seed=options['seed'],
+        )
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'parameters': {
+                key: options[key]
+                for key in ('symbols', 'years', 'seed', 'repeat', 'csv_files', 'investments')
+            },
+            'environment': environment(),
+            'setup': setup,
+            'results': results,
+        }
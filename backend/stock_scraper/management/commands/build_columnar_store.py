@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from stock_scraper.columnar_store import store_dir, write_symbol
+from stock_scraper.models import StockOHLC
+
+class Command(BaseCommand):
+    help = 'Write the memory-mapped columnar OHLC store from StockOHLC'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--symbol',
+            type=str,
+            help='Write a single symbol instead of every symbol'
+        )
+
+    def handle(self, *args, **options):
+        if store_dir() is None:
+            raise CommandError('STOCK_COLUMNAR_STORE_DIR is not set.')
+
+        if options['symbol']:
+            symbols = [options['symbol']]
+        else:
+            symbols = StockOHLC.objects.values_list('symbol', flat=True).distinct().order_by('symbol')
+
+        total = 0
+        for symbol in symbols:
+            bars = write_symbol(symbol)
+            total += bars
+            self.stdout.write(f"Wrote {bars} bars for {symbol}")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Columnar store written to {store_dir()} ({total} bars)."))
@@ -0,0 +1,46 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from stock_scraper.export import EXPORT_CHUNK_ROWS, EXPORT_FORMATS, export_rows, iter_export
+
+class Command(BaseCommand):
+    help = 'Stream stored OHLC bars to a file (or stdout) as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson', help='Output format')
+        parser.add_argument('--symbol', action='append', help='Symbol to export (repeatable, default: all)')
+        parser.add_argument('--start', type=str, help='First date to export (YYYY-MM-DD)')
+        parser.add_argument('--end', type=str, help='Last date to export (YYYY-MM-DD)')
+        parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS, help='Rows fetched and written per chunk')
+        parser.add_argument('--output', type=str, help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else None
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else None
+        except ValueError:
+            raise CommandError('Invalid date format. Please use YYYY-MM-DD')
+        if options['chunk_rows'] <= 0:
+            raise CommandError('--chunk-rows must be greater than 0')
+
+        rows = export_rows(options['symbol'], start, end, options['chunk_rows'])
+        chunks = iter_export(options['format'], rows, options['chunk_rows'])
+        started = time.perf_counter()
+        written = 0
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    written += chunk.count('\n')
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+                written += chunk.count('\n')
+
+        if options['format'] == 'csv':
+            written -= 1  # header line
+        # Keep stdout clean for piping; report on stderr
+        self.stderr.write(self.style.SUCCESS(
+            f"✅ Exported {written} rows as {options['format']} in {time.perf_counter() - started:.2f}s"
+        ))
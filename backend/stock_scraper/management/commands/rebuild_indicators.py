@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from stock_scraper.indicator_table import rebuild_symbol_indicators
+from stock_scraper.models import StockOHLC
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized indicators (StockIndicator) from StockOHLC'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--symbol',
+            type=str,
+            help='Rebuild a single symbol instead of every symbol'
+        )
+
+    def handle(self, *args, **options):
+        if options['symbol']:
+            symbols = [options['symbol']]
+        else:
+            symbols = StockOHLC.objects.values_list('symbol', flat=True).distinct().order_by('symbol')
+
+        total = 0
+        for symbol in symbols:
+            rows = rebuild_symbol_indicators(symbol)
+            total += rows
+            self.stdout.write(f"Rebuilt {rows} indicator rows for {symbol}")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {total} indicator rows."))
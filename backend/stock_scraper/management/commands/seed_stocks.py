@@ -1,7 +1,16 @@
 import os
-import pandas as pd
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from django.core.management.base import BaseCommand
-from stock_scraper.models import StockOHLC
+from backend import metrics
+from stock_scraper.csv_parsing import parse_ohlc_file
+from stock_scraper.ingest import BATCH_SIZE, insert_new_ohlc, upsert_symbol_ohlc
+from stock_scraper.signals import ohlc_written
+
+# Bad rows listed per file in the folder summary
+ERRORS_SHOWN = 5
 
 class Command(BaseCommand):
     help = 'Seed stock OHLC data from CSV files'
@@ -23,154 +32,131 @@ class Command(BaseCommand):
             default='E:/1Stockease/backend/stock_scraper/stocks',
             help='Folder path containing CSV files'
         )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='With --file, also overwrite stored bars whose values changed'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Parser processes for --folder (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Rows per INSERT statement'
+        )
 
     def handle(self, *args, **options):
         if options['file'] and options['symbol']:
             # Seed specific file
-            self.seed_single_file(options['file'], options['symbol'])
+            self.seed_single_file(options['file'], options['symbol'], options['upsert'], options['batch_size'])
         else:
             # Seed all files in folder
-            self.seed_folder(options['folder'])
+            self.seed_folder(options['folder'], options['workers'], options['batch_size'])
 
-    def seed_single_file(self, file_path, symbol):
+    def seed_single_file(self, file_path, symbol, upsert=False, batch_size=BATCH_SIZE):
         """Seed a single CSV file with specified symbol"""
-        try:
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            self.stdout.write(f"CSV loaded successfully. Columns: {list(df.columns)}")
-            self.stdout.write(f"CSV has {len(df)} rows")
-            
-            # Define column mapping for Excel format
-            column_mapping = {
-                'Date': 'date',
-                'date': 'date',
-                'Open': 'open',
-                'open': 'open',
-                'High': 'high',
-                'high': 'high',
-                'Low': 'low',
-                'low': 'low',
-                'Close': 'close',
-                'close': 'close',
-                'Volume': 'volume',
-                'volume': 'volume',
-                'Turn Over': 'turnover',
-                'turnover': 'turnover',
-                'Percent Cl': 'percent_change',
-                'percent_change': 'percent_change'
-            }
-            
-            # Rename columns based on mapping
-            df = df.rename(columns=column_mapping)
-            self.stdout.write(f"After mapping. Columns: {list(df.columns)}")
-            
-            # Validate required columns after mapping
-            required_columns = ['date', 'open', 'high', 'low', 'close', 'volume']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                self.stdout.write(self.style.ERROR(f'Missing required columns after mapping: {missing_columns}. Available columns: {list(df.columns)}'))
-                return
-            
-            # Convert symbol to lowercase
-            symbol = symbol.lower()
-            self.stdout.write(f"Processing symbol: {symbol}")
-            
-            # Get existing dates for this symbol
-            existing_dates = set(StockOHLC.objects.filter(symbol=symbol).values_list('date', flat=True))
-            self.stdout.write(f"Found {len(existing_dates)} existing dates for {symbol}")
-            
-            # Process and save data
-            records_created = 0
-            records_skipped = 0
-            
-            for index, row in df.iterrows():
-                try:
-                    # Handle different date formats
-                    date_value = row['date']
-                    
-                    if isinstance(date_value, str):
-                        # Try different date formats
-                        try:
-                            parsed_date = pd.to_datetime(date_value, format='%m/%d/%Y').date()
-                        except:
-                            try:
-                                parsed_date = pd.to_datetime(date_value).date()
-                            except:
-                                self.stdout.write(f"Could not parse date: {date_value}")
-                                continue
-                    else:
-                        parsed_date = pd.to_datetime(date_value).date()
-                    
-                    # Check if this date already exists
-                    if parsed_date in existing_dates:
-                        records_skipped += 1
-                        continue
-                    
-                    StockOHLC.objects.create(
-                        symbol=symbol,
-                        date=parsed_date,
-                        open=float(row['open']),
-                        high=float(row['high']),
-                        low=float(row['low']),
-                        close=float(row['close']),
-                        volume=int(row['volume']),
-                        percent=0.0  # Default value
-                    )
-                    records_created += 1
-                    
-                except Exception as e:
-                    self.stdout.write(f"Error processing row {index}: {str(e)}")
-                    continue
-            
-            if records_created == 0:
-                self.stdout.write(self.style.WARNING(f'No new records added for {symbol}. All dates already exist in database.'))
-            else:
-                self.stdout.write(self.style.SUCCESS(f'Successfully seeded {records_created} new records for {symbol}. Skipped {records_skipped} existing records.'))
-                
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error processing CSV file: {str(e)}'))
-
-    def seed_folder(self, folder_path):
-        """Seed all CSV files in a folder"""
-        rows = []
-
-        def clean_number(value):
-            try:
-                value = str(value).replace(",", "").strip()
-                if value == '':
-                    return 0
-                return float(value) if '.' in value else int(value)
-            except Exception as e:
-                print(f"Error cleaning value '{value}': {e}")
-                return 0
-
-        for file in os.listdir(folder_path):
-            if file.endswith('.csv'):
-                symbol = os.path.splitext(file)[0]
-                file_path = os.path.join(folder_path, file)
-
-                try:
-                    df = pd.read_csv(file_path)
-                except Exception as e:
-                    self.stdout.write(f"Error reading {file}: {e}")
+        started = time.perf_counter()
+        parsed = parse_ohlc_file(file_path)
+        if parsed['failed']:
+            self.stdout.write(self.style.ERROR(f"Error processing CSV file: {parsed['failed']}"))
+            return
+        rows = parsed['rows']
+        for error in parsed['errors']:
+            self.stdout.write(f"Error processing {error}")
+
+        # Convert symbol to lowercase
+        symbol = symbol.lower()
+        self.stdout.write(f"Processing symbol: {symbol} ({len(rows)} valid rows)")
+
+        if upsert:
+            counts = upsert_symbol_ohlc(symbol, rows, batch_size)
+            records_created = counts['inserted']
+            replaced = counts['rewrote_history']
+            changed = counts['inserted'] + counts['updated']
+            summary = (
+                f"{counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged for {symbol}."
+            )
+        else:
+            records_created = insert_new_ohlc(symbol, rows, batch_size)
+            replaced = False
+            changed = records_created
+            summary = (
+                f"Successfully seeded {records_created} new records for {symbol}. "
+                f"Skipped {len(rows) - records_created} existing records."
+            )
+
+        elapsed = time.perf_counter() - started
+        metrics.observe_ingest('seed_single_file', changed, elapsed)
+        if changed:
+            ohlc_written.send(sender=self.__class__, symbols=[symbol], replaced=replaced)
+
+        if changed == 0:
+            self.stdout.write(self.style.WARNING(f'No new or changed records for {symbol}. All dates already exist in database.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary} ({elapsed:.1f}s)"))
+
+    def seed_folder(self, folder_path, workers=None, batch_size=BATCH_SIZE):
+        """Seed all CSV files in a folder: parse in worker processes, write from this one"""
+        started = time.perf_counter()
+        paths = sorted(
+            os.path.join(folder_path, file) for file in os.listdir(folder_path) if file.endswith('.csv')
+        )
+        workers = workers or os.cpu_count() or 1
+        self.stdout.write(f"Seeding {len(paths)} files with {workers} parser processes")
+
+        symbols = []
+        summary = []
+        total_parsed = 0
+        total_inserted = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a bounded number of parsed files in flight so memory stays flat
+            pending = deque()
+            remaining = iter(paths)
+            for path in islice(remaining, workers * 2):
+                pending.append(pool.submit(parse_ohlc_file, path))
+
+            done = 0
+            while pending:
+                parsed = pending.popleft().result()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append(pool.submit(parse_ohlc_file, next_path))
+                done += 1
+
+                if parsed['failed']:
+                    summary.append((parsed['file'], [f"Could not read file: {parsed['failed']}"]))
+                    self.stdout.write(self.style.ERROR(f"[{done}/{len(paths)}] {parsed['file']}: {parsed['failed']}"))
                     continue
 
-                for index, row in df.iterrows():
-                    try:
-                        rows.append(
-                            StockOHLC(
-                                symbol=symbol,
-                                date=row['Date'],
-                                open=clean_number(row['Open']),
-                                high=clean_number(row['High']),
-                                low=clean_number(row['Low']),
-                                close=clean_number(row['Close']),
-                                percent=clean_number(row.get('Percent', 0)),
-                                volume=clean_number(row['Volume']),
-                            )
-                        )
-                    except Exception as e:
-                        self.stdout.write(f"Error processing row in {file}: {row} — {e}")
-
-        StockOHLC.objects.bulk_create(rows, ignore_conflicts=True)
+                inserted = insert_new_ohlc(parsed['symbol'], parsed['rows'], batch_size)
+                symbols.append(parsed['symbol'])
+                total_parsed += len(parsed['rows'])
+                total_inserted += inserted
+                if parsed['errors']:
+                    summary.append((parsed['file'], parsed['errors']))
+                self.stdout.write(
+                    f"[{done}/{len(paths)}] {parsed['file']}: {inserted} new of {len(parsed['rows'])} rows"
+                    + (f", {len(parsed['errors'])} bad rows" if parsed['errors'] else '')
+                )
+
+        elapsed = time.perf_counter() - started
+        metrics.observe_ingest('seed_folder', total_inserted, elapsed)
+        if symbols:
+            ohlc_written.send(sender=self.__class__, symbols=symbols, replaced=False)
+
+        for file, errors in summary:
+            self.stdout.write(self.style.WARNING(f"{file}: {len(errors)} problem(s)"))
+            for error in errors[:ERRORS_SHOWN]:
+                self.stdout.write(f"    {error}")
+            if len(errors) > ERRORS_SHOWN:
+                self.stdout.write(f"    ... and {len(errors) - ERRORS_SHOWN} more")
         self.stdout.write(self.style.SUCCESS("✅ Stock OHLC data seeded successfully."))
+        self.stdout.write(
+            f"{total_inserted} new of {total_parsed} parsed rows in {elapsed:.1f}s "
+            f"({total_parsed / elapsed if elapsed else 0:.0f} rows/s), {len(summary)} file(s) with problems"
+        )
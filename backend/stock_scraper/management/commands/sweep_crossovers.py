@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from stock_scraper.backtest import backtest_workers, sweep_universe
+from stock_scraper.backtest_engine import SWEEP_LONG_WINDOWS, SWEEP_METRICS, SWEEP_SHORT_WINDOWS
+
+class Command(BaseCommand):
+    help = 'Backtest MA/EMA crossovers over a grid of short/long windows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=['ma', 'ema'], default='ma', help='Moving average type')
+        parser.add_argument(
+            '--short', type=int, nargs='+', default=list(SWEEP_SHORT_WINDOWS), help='Short windows to try'
+        )
+        parser.add_argument(
+            '--long', type=int, nargs='+', default=list(SWEEP_LONG_WINDOWS), help='Long windows to try'
+        )
+        parser.add_argument('--metric', choices=SWEEP_METRICS, default='total_return', help='Metric to rank pairs by')
+        parser.add_argument('--cost-bps', type=float, default=0.0, help='Cost per position change in basis points')
+        parser.add_argument('--symbol', action='append', help='Symbol to sweep (repeatable, default: all)')
+        parser.add_argument(
+            '--workers', type=int, help='Processes to split the symbols across (default: BACKTEST_WORKERS or one per CPU)'
+        )
+        parser.add_argument('--output', type=str, help='Write the full report, with per-symbol matrices, to this JSON file')
+
+    def handle(self, *args, **options):
+        short_windows = sorted(set(options['short']))
+        long_windows = sorted(set(options['long']))
+        started = time.perf_counter()
+        report = sweep_universe(
+            short_windows, long_windows, options['kind'], options['metric'], options['cost_bps'],
+            symbols=options['symbol'], workers=options['workers'] or backtest_workers(),
+        )
+        elapsed = time.perf_counter() - started
+        if not report['symbols']:
+            raise CommandError('No OHLC data to sweep.')
+
+        # Universe median matrix: one row per short window, one column per long window
+        self.stdout.write(f"Median {options['metric']} across {len(report['symbols'])} symbols ({options['kind'].upper()}):")
+        self.stdout.write('short\\long ' + ''.join(f'{window:>9}' for window in long_windows))
+        for short, row in zip(short_windows, report['universe']['median']):
+            self.stdout.write(f'{short:>10} ' + ''.join('        -' if value is None else f'{value:9.2f}' for value in row))
+
+        best = report['universe']['best']
+        if best:
+            self.stdout.write(f"Best pair for the universe: {best['short']}/{best['long']} ({best['value']:.2f})")
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Full report written to {options['output']}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Swept {len(short_windows)}x{len(long_windows)} windows in {elapsed:.1f}s."))
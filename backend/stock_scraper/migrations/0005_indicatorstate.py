@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_scraper', '0004_alter_investment_stock_alter_stockohlc_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('indicator', models.CharField(max_length=20)),
+                ('last_date', models.DateField()),
+                ('bars', models.IntegerField(default=0)),
+                ('last_close', models.FloatField(blank=True, null=True)),
+                ('value', models.FloatField(blank=True, null=True)),
+                ('window_sum', models.FloatField(blank=True, null=True)),
+                ('avg_gain', models.FloatField(blank=True, null=True)),
+                ('avg_loss', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('symbol', 'indicator')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_scraper', '0005_indicatorstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockIndicator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('date', models.DateField()),
+                ('close', models.FloatField()),
+                ('ma50', models.FloatField(blank=True, null=True)),
+                ('ma200', models.FloatField(blank=True, null=True)),
+                ('ema9', models.FloatField(blank=True, null=True)),
+                ('ema21', models.FloatField(blank=True, null=True)),
+                ('ema20', models.FloatField(blank=True, null=True)),
+                ('ema50', models.FloatField(blank=True, null=True)),
+                ('rsi', models.FloatField(blank=True, null=True)),
+                ('signal', models.SmallIntegerField(default=0)),
+                ('position', models.FloatField(blank=True, null=True)),
+                ('golden_cross_signal', models.SmallIntegerField(default=0)),
+                ('ema_short_signal', models.SmallIntegerField(default=0)),
+                ('ema_medium_signal', models.SmallIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('symbol', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_scraper', '0008_ingestjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['user', '-buy_date', '-id'], name='investment_user_buy_date_idx'),
+        ),
+    ]
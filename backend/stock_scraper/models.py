@@ -18,6 +18,105 @@ class StockOHLC(models.Model):
     def __str__(self):
         return f"{self.symbol} - {self.date}"
 
+class StockSnapshot(models.Model):
+    """
+    Latest quote per symbol, refreshed after every ingest for /stocks/.
+    """
+    symbol = models.CharField(max_length=20, unique=True)
+    date = models.DateField()
+    close = models.FloatField()
+    previous_close = models.FloatField(null=True, blank=True)
+    volume = models.BigIntegerField()
+    volatility = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['symbol']
+
+    def __str__(self):
+        return f"{self.symbol} @ {self.date}"
+
+class IndicatorState(models.Model):
+    """
+    Running state of one indicator for one symbol after its latest bar, so
+    appended bars can be folded in without recomputing the full history.
+    """
+    symbol = models.CharField(max_length=20)
+    indicator = models.CharField(max_length=20)
+    last_date = models.DateField()
+    bars = models.IntegerField(default=0)
+    last_close = models.FloatField(null=True, blank=True)
+    value = models.FloatField(null=True, blank=True)
+    window_sum = models.FloatField(null=True, blank=True)
+    avg_gain = models.FloatField(null=True, blank=True)
+    avg_loss = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['symbol', 'indicator']
+
+    def __str__(self):
+        return f"{self.symbol} - {self.indicator} @ {self.last_date}"
+
+class StockIndicator(models.Model):
+    """
+    Indicator values and strategy signals for one symbol on one day,
+    materialized at ingest time for the strategy views.
+    """
+    symbol = models.CharField(max_length=20)
+    date = models.DateField()
+    close = models.FloatField()
+    ma50 = models.FloatField(null=True, blank=True)
+    ma200 = models.FloatField(null=True, blank=True)
+    ema9 = models.FloatField(null=True, blank=True)
+    ema21 = models.FloatField(null=True, blank=True)
+    ema20 = models.FloatField(null=True, blank=True)
+    ema50 = models.FloatField(null=True, blank=True)
+    rsi = models.FloatField(null=True, blank=True)
+    signal = models.SmallIntegerField(default=0)
+    position = models.FloatField(null=True, blank=True)
+    golden_cross_signal = models.SmallIntegerField(default=0)
+    ema_short_signal = models.SmallIntegerField(default=0)
+    ema_medium_signal = models.SmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['symbol', 'date']
+
+    def __str__(self):
+        return f"{self.symbol} - {self.date} indicators"
+
+class IngestJob(models.Model):
+    """
+    A CSV upload queued for the background ingest worker.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    symbol = models.CharField(max_length=20)
+    file_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    rows_processed = models.IntegerField(default=0)
+    records_created = models.IntegerField(default=0)
+    deleted_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.symbol} ingest #{self.pk} ({self.status})"
+
 class Investment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='investments', null=True)
     stock = models.ForeignKey(StockOHLC, on_delete=models.CASCADE, related_name='investments')
@@ -32,11 +131,15 @@ class Investment(models.Model):
 
     class Meta:
         ordering = ['-buy_date']
+        indexes = [
+            # Keyset pagination of a user's investments, newest first
+            models.Index(fields=['user', '-buy_date', '-id'], name='investment_user_buy_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.stock.symbol} - {self.buy_date}"
 
     def calculate_pl(self):
+        # Only sets total_pl; the caller saves
         if self.sell_price and self.buy_price:
             self.total_pl = (self.sell_price - self.buy_price) * self.quantity
-            self.save()
@@ -0,0 +1,177 @@
+"""
+Process-local LRU cache of per-symbol OHLC history as contiguous NumPy arrays.
+
+Entries are tagged with the symbol's StockSnapshot.updated_at, which every
+ingest refreshes, so workers that did not run the ingest still notice new
+bars. The ingesting process also drops its entries on ohlc_written.
+
+The cache sits in front of the columnar store: a miss is served from the
+store's memory maps when it holds the symbol, from the database otherwise,
+and either way the arrays are cached. Memory-mapped arrays do not count
+against the byte budget, so a universe served from the store stays cached
+in full; only arrays loaded from the database can be evicted.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.dispatch import receiver
+
+from backend import metrics
+
+from stock_scraper.columnar_store import open_symbol
+from stock_scraper.models import StockOHLC, StockSnapshot
+from stock_scraper.signals import ohlc_written
+
+OHLC_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCCache:
+    """
+    Symbol -> {'date', 'open', 'high', 'low', 'close', 'volume'} arrays,
+    evicting least recently used symbols beyond `max_bytes`
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(arrays):
+        # Memory-mapped store arrays live in the page cache, not on the heap
+        return sum(array.nbytes for array in arrays.values() if not isinstance(array, np.memmap))
+
+    def get(self, symbol, version):
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._drop(symbol)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(symbol)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, symbol, version, arrays):
+        size = self._size(arrays)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if symbol in self._entries:
+                self._drop(symbol)
+            self._entries[symbol] = (version, arrays)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, symbol):
+        _, arrays = self._entries.pop(symbol)
+        self.bytes -= self._size(arrays)
+
+    def invalidate(self, symbols=None):
+        with self._lock:
+            for symbol in list(self._entries if symbols is None else symbols):
+                if symbol in self._entries:
+                    self._drop(symbol)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else None,
+            }
+
+
+ohlc_cache = OHLCCache(getattr(settings, 'STOCK_OHLC_CACHE_BYTES', 64 * 1024 * 1024))
+metrics.register_cache('ohlc', ohlc_cache.stats)
+
+
+def _frame_to_arrays(frame):
+    arrays = {'date': pd.to_datetime(frame['date']).to_numpy().astype('datetime64[D]')}
+    for field in OHLC_FIELDS:
+        arrays[field] = np.ascontiguousarray(frame[field].to_numpy(dtype=np.float64))
+    for array in arrays.values():
+        array.flags.writeable = False
+    return arrays
+
+
+def load_symbols_ohlc(symbols=None):
+    """
+    OHLC arrays (oldest bar first) for the given symbols, or every symbol.
+
+    Cached symbols are served from memory. Cache misses are memory-mapped
+    from the columnar store when it holds them, and the rest are loaded
+    in one query; both are cached for the next call.
+    Returns {symbol: arrays} for symbols that have data.
+    """
+    snapshots = StockSnapshot.objects.order_by('symbol')
+    if symbols is None:
+        # Every ingested symbol has a snapshot
+        versions = {
+            symbol: updated_at.isoformat() for symbol, updated_at in snapshots.values_list('symbol', 'updated_at')
+        }
+        symbols = list(versions)
+    else:
+        symbols = list(symbols)
+        versions = {
+            symbol: updated_at.isoformat()
+            for symbol, updated_at in snapshots.filter(symbol__in=symbols).values_list('symbol', 'updated_at')
+        } if symbols else {}
+    result = {}
+    missing = []
+    for symbol in symbols:
+        # Without a snapshot there is no version to tag a cache entry with
+        if symbol not in versions:
+            missing.append(symbol)
+            continue
+        arrays = ohlc_cache.get(symbol, versions[symbol])
+        if arrays is None:
+            arrays = open_symbol(symbol, versions[symbol])
+            if arrays is None:
+                missing.append(symbol)
+                continue
+            ohlc_cache.put(symbol, versions[symbol], arrays)
+        result[symbol] = arrays
+
+    if missing:
+        frame = pd.DataFrame.from_records(
+            StockOHLC.objects.filter(symbol__in=missing)
+            .order_by('symbol', 'date')
+            .values_list('symbol', 'date', *OHLC_FIELDS),
+            columns=['symbol', 'date', *OHLC_FIELDS],
+        )
+        for symbol, rows in frame.groupby('symbol', sort=False):
+            arrays = _frame_to_arrays(rows)
+            if symbol in versions:
+                ohlc_cache.put(symbol, versions[symbol], arrays)
+            result[symbol] = arrays
+
+    return {symbol: result[symbol] for symbol in symbols if symbol in result}
+
+
+def get_symbol_ohlc(symbol):
+    """
+    OHLC arrays for one symbol, or None when it has no data
+    """
+    return load_symbols_ohlc([symbol]).get(symbol)
+
+
+@receiver(ohlc_written)
+def invalidate_ingested_symbols(sender, symbols, **kwargs):
+    ohlc_cache.invalidate(symbols)
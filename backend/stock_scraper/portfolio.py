@@ -0,0 +1,123 @@
+"""
+Mark-to-market valuation of a user's investments.
+
+Every Investment row is read in one query, joined to its symbol's latest
+close from StockSnapshot. Positions are then grouped per symbol with
+NumPy: open lots (no sell price) are valued at the latest close, sold
+lots contribute their realized P&L. A lot with a sell date but no sell
+price has no realized P&L to report, so it stays open and is counted in
+the totals' incomplete_lots.
+"""
+import numpy as np
+from django.db.models import F, OuterRef, Subquery
+
+from stock_scraper.indicators import optional_float
+from stock_scraper.models import Investment, StockSnapshot
+
+
+def _percent(numerator, denominator):
+    numerator, denominator = np.asarray(numerator, dtype=np.float64), np.asarray(denominator, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, numerator / denominator * 100, np.nan)
+
+
+def load_lots(user):
+    """
+    (symbol, quantity, buy_price, sell_price, sell_date, last_close,
+    last_date) for every investment of `user`, in one query
+    """
+    latest = StockSnapshot.objects.filter(symbol=OuterRef('stock__symbol'))
+    return list(
+        Investment.objects.filter(user=user)
+        .order_by()
+        .annotate(
+            symbol=F('stock__symbol'),
+            last_close=Subquery(latest.values('close')[:1]),
+            last_date=Subquery(latest.values('date')[:1]),
+        )
+        .values_list('symbol', 'quantity', 'buy_price', 'sell_price', 'sell_date', 'last_close', 'last_date')
+    )
+
+
+def portfolio_summary(user):
+    """
+    Cost basis, market value, unrealized and realized P&L and weight per
+    symbol and for the whole portfolio. Weights are each symbol's share of
+    the total market value of open positions, in percent.
+    """
+    lots = load_lots(user)
+    if not lots:
+        return {'positions': [], 'totals': _totals()}
+
+    symbols, quantity, buy_price, sell_price, sell_date, last_close, last_date = zip(*lots)
+    names, group = np.unique(np.array(symbols, dtype=object), return_inverse=True)
+    quantity = np.array(quantity, dtype=np.float64)
+    buy_price = np.array(buy_price, dtype=np.float64)
+    sell_price = np.array([np.nan if price is None else price for price in sell_price])
+    last_close = np.array([np.nan if close is None else close for close in last_close])
+    is_open = np.isnan(sell_price)
+    is_sold = ~is_open
+    incomplete = is_open & np.array([date is not None for date in sell_date])
+
+    def per_symbol(values, mask):
+        return np.bincount(group, weights=np.where(mask, values, 0.0), minlength=len(names))
+
+    open_quantity = per_symbol(quantity, is_open)
+    cost_basis = per_symbol(buy_price * quantity, is_open)
+    # A symbol without a snapshot has no price to mark its open lots at
+    priced = per_symbol(np.isnan(last_close) & is_open, True) == 0
+    market_value = np.where(priced, per_symbol(np.nan_to_num(last_close) * quantity, is_open), np.nan)
+    unrealized = market_value - cost_basis
+    realized = per_symbol((np.nan_to_num(sell_price) - buy_price) * quantity, is_sold)
+    sold_quantity = per_symbol(quantity, is_sold)
+
+    closes = np.full(len(names), np.nan)
+    dates = [None] * len(names)
+    for i, close, date in zip(group, last_close, last_date):
+        closes[i], dates[i] = close, date
+
+    total_value = np.nansum(market_value)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_cost = np.where(open_quantity > 0, cost_basis / open_quantity, np.nan)
+        weight = np.where(total_value > 0, market_value / total_value * 100, np.nan)
+    unrealized_percent = _percent(unrealized, cost_basis)
+
+    positions = [
+        {
+            'symbol': symbol,
+            'open_quantity': int(open_quantity[i]),
+            'sold_quantity': int(sold_quantity[i]),
+            'average_cost': optional_float(average_cost[i]),
+            'cost_basis': float(cost_basis[i]),
+            'last_close': optional_float(closes[i]),
+            'last_date': dates[i].strftime('%Y-%m-%d') if dates[i] else None,
+            'market_value': optional_float(market_value[i]) if open_quantity[i] else 0.0,
+            'unrealized_pl': optional_float(unrealized[i]) if open_quantity[i] else 0.0,
+            'unrealized_pl_percent': optional_float(unrealized_percent[i]),
+            'realized_pl': float(realized[i]),
+            'weight': optional_float(weight[i]) if open_quantity[i] else 0.0,
+        }
+        for i, symbol in enumerate(names)
+    ]
+    open_priced = priced & (open_quantity > 0)
+    return {
+        'positions': positions,
+        'totals': _totals(
+            cost_basis.sum(), cost_basis[open_priced].sum(), total_value, np.nansum(unrealized),
+            realized.sum(), int((~priced).sum()), int(incomplete.sum()),
+        ),
+    }
+
+
+def _totals(cost_basis=0.0, priced_cost=0.0, market_value=0.0, unrealized=0.0, realized=0.0, unpriced=0,
+            incomplete=0):
+    return {
+        'cost_basis': float(cost_basis),
+        'market_value': float(market_value),
+        'unrealized_pl': float(unrealized),
+        'unrealized_pl_percent': optional_float(_percent(unrealized, priced_cost)),
+        'realized_pl': float(realized),
+        'total_pl': float(unrealized + realized),
+        'unpriced_symbols': unpriced,
+        'incomplete_lots': incomplete,
+    }
@@ -0,0 +1,90 @@
+"""
+Content negotiation for the time-series views.
+
+Formats, picked with ?format= or the Accept header:
+
+    rows      application/json (default)         {"data": [{...}, ...], "metadata": ...}
+    columns   application/vnd.stockease.columns+json
+                                                 {"columns": {"close": [...], ...}, "metadata": ...}
+    msgpack   application/msgpack                the columns layout, MessagePack-encoded
+
+Columnar layouts are encoded straight from the DataFrame's NumPy arrays
+instead of building one dict per row. MessagePack needs the optional
+msgpack package; without it that format answers 406.
+"""
+import numpy as np
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+COLUMNS_CONTENT_TYPE = 'application/vnd.stockease.columns+json'
+MSGPACK_CONTENT_TYPES = ('application/msgpack', 'application/x-msgpack')
+FORMATS = ('rows', 'columns', 'msgpack')
+
+
+def negotiate_format(request):
+    """
+    Response format requested by the client, or None when it is unknown
+    """
+    requested = request.GET.get('format')
+    if requested:
+        return requested if requested in FORMATS else None
+
+    accepted = [media.split(';')[0].strip() for media in request.headers.get('Accept', '').split(',')]
+    for media in accepted:
+        if media in MSGPACK_CONTENT_TYPES:
+            return 'msgpack'
+        if media == COLUMNS_CONTENT_TYPE:
+            return 'columns'
+    return 'rows'
+
+
+def _column_values(series):
+    values = series.to_numpy()
+    if np.issubdtype(values.dtype, np.datetime64):
+        return np.datetime_as_string(values.astype('datetime64[s]')).tolist()
+    if np.issubdtype(values.dtype, np.floating) and np.isnan(values).any():
+        return np.where(np.isnan(values), None, values).tolist()
+    return values.tolist()
+
+
+def frame_columns(frame):
+    """
+    One list per column, converted from NumPy in bulk
+    """
+    return {column: _column_values(frame[column]) for column in frame.columns}
+
+
+def render_frame(request, frame, metadata):
+    """
+    Respond with `frame` (one row per bar, date as a column) in the
+    negotiated format
+    """
+    data_format = negotiate_format(request)
+    if data_format is None:
+        return JsonResponse(
+            {"error": f"Unsupported format. Use one of: {', '.join(FORMATS)}."}, status=406
+        )
+
+    if data_format == 'rows':
+        response = JsonResponse({
+            "data": frame.to_dict(orient='records'),
+            "metadata": metadata
+        }, safe=False)
+    elif data_format == 'columns':
+        response = JsonResponse({
+            "columns": frame_columns(frame),
+            "metadata": metadata
+        }, content_type=COLUMNS_CONTENT_TYPE)
+    else:
+        if msgpack is None:
+            return JsonResponse({"error": "MessagePack support is not installed."}, status=406)
+        payload = msgpack.packb({"columns": frame_columns(frame), "metadata": metadata})
+        response = HttpResponse(payload, content_type=MSGPACK_CONTENT_TYPES[0])
+
+    patch_vary_headers(response, ['Accept'])
+    return response
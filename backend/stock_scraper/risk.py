@@ -0,0 +1,82 @@
+"""
+Universe-wide risk metrics computed in one vectorized pass.
+
+All symbols' closes are loaded once into a (symbols x bars) matrix; every
+metric is then computed for every symbol with whole-array operations.
+Results are cached per universe version, so they are reused until new
+bars arrive.
+"""
+import numpy as np
+from django.core.cache import cache
+
+from backend.metrics import cache_lookups
+
+from stock_scraper.indicators import latest_volatility, max_drawdown, optional_float
+from stock_scraper.snapshots import universe_version
+from stock_scraper.universe import load_close_matrix
+
+# Lookbacks (in bars) for annualized volatility
+VOLATILITY_WINDOWS = (20, 30, 60, 252)
+# Lookback (in bars) for downside deviation
+DOWNSIDE_WINDOW = 252
+TRADING_DAYS = 252
+
+
+def _log_returns(closes):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(closes[:, 1:] / closes[:, :-1])
+    returns[~(closes[:, :-1] > 0)] = np.nan
+    return returns
+
+
+def downside_deviation(returns, window=DOWNSIDE_WINDOW):
+    """
+    Annualized downside deviation (in percent) of the last `window - 1`
+    returns, measured against a zero target
+    """
+    recent = returns[:, -(window - 1):]
+    count = (~np.isnan(recent)).sum(axis=1)
+    downside = np.nansum(np.minimum(recent, 0.0) ** 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deviation = np.sqrt(downside / count) * np.sqrt(TRADING_DAYS) * 100
+    deviation[count < 1] = np.nan
+    return deviation
+
+
+def compute_risk_metrics():
+    """
+    Volatility for every window in VOLATILITY_WINDOWS, max drawdown and
+    downside deviation for every symbol
+    """
+    symbols, dates, closes = load_close_matrix()
+    if not symbols:
+        return []
+
+    returns = _log_returns(closes)
+    volatility = {window: latest_volatility(closes, window) for window in VOLATILITY_WINDOWS}
+    drawdown = max_drawdown(closes)
+    downside = downside_deviation(returns)
+
+    return [
+        {
+            'symbol': symbol,
+            'date': str(dates[i, -1]),
+            'volatility': {str(window): optional_float(volatility[window][i]) for window in VOLATILITY_WINDOWS},
+            'max_drawdown': optional_float(drawdown[i]),
+            'downside_deviation': optional_float(downside[i]),
+        }
+        for i, symbol in enumerate(symbols)
+    ]
+
+
+def cached_risk_metrics():
+    """
+    Cached compute_risk_metrics(), recomputed once new bars are ingested
+    """
+    key = f'stock_scraper:risk_metrics:{universe_version()}'
+    metrics = cache.get(key)
+    cache_lookups.inc(cache='risk_metrics', result='miss' if metrics is None else 'hit')
+    if metrics is None:
+        metrics = compute_risk_metrics()
+        cache.set(key, metrics, None)
+    return metrics
@@ -0,0 +1,65 @@
+"""
+Latest indicator readings and strategy signals for the whole universe,
+computed in one batched pass over a (symbols x bars) close matrix.
+Results for the whole universe are cached per universe version.
+"""
+from django.core.cache import cache
+
+from backend.metrics import cache_lookups
+
+from stock_scraper.indicators import (
+    calculate_strategy_indicators, first_valid_index, latest_volatility, optional_float
+)
+from stock_scraper.snapshots import universe_version
+from stock_scraper.strategies import (
+    GOLDEN_CROSS_START, MA_CROSSOVER_STRATEGIES, crossover_signals, golden_cross_momentum_signals
+)
+from stock_scraper.universe import load_close_matrix
+
+
+def screen_universe(symbols=None):
+    """
+    Latest close, RSI, 30-day volatility and strategy signals per symbol
+    """
+    symbols, dates, closes = load_close_matrix(symbols)
+    if not symbols:
+        return []
+
+    indicators = calculate_strategy_indicators(closes)
+    start = first_valid_index(closes) + GOLDEN_CROSS_START
+    golden_cross = golden_cross_momentum_signals(
+        indicators['MA50'], indicators['MA200'], indicators['RSI'], start
+    )[:, -1]
+    crossovers = {
+        key: crossover_signals(indicators[strategy['short_ma']], indicators[strategy['long_ma']])[:, -1]
+        for key, strategy in MA_CROSSOVER_STRATEGIES.items()
+    }
+    volatility = latest_volatility(closes)
+
+    results = []
+    for i, symbol in enumerate(symbols):
+        results.append({
+            'symbol': symbol,
+            'date': str(dates[i, -1]),
+            'close': optional_float(closes[i, -1]),
+            'rsi': optional_float(indicators['RSI'][i, -1]),
+            'volatility': optional_float(volatility[i]),
+            'golden_cross_signal': int(golden_cross[i]),
+            'ema_short_signal': int(crossovers['ema_short'][i]),
+            'ema_medium_signal': int(crossovers['ema_medium'][i]),
+        })
+    return results
+
+
+def cached_screen_universe():
+    """
+    Cached screen_universe() for the whole universe, recomputed once new
+    bars are ingested
+    """
+    key = f'stock_scraper:screener:{universe_version()}'
+    results = cache.get(key)
+    cache_lookups.inc(cache='screener', result='miss' if results is None else 'hit')
+    if results is None:
+        results = screen_universe()
+        cache.set(key, results, None)
+    return results
@@ -0,0 +1,11 @@
+from django.dispatch import Signal
+
+# Sent after StockOHLC rows are written by an ingest path.
+# Arguments: symbols (list of symbols touched) and replaced (True when the
+# symbol's history was rewritten rather than appended to).
+ohlc_written = Signal()
+
+# Sent by refresh_snapshots() after StockSnapshot rows are rewritten.
+# Arguments: versions ({symbol: StockSnapshot.updated_at as ISO string, or
+# None when the symbol lost its snapshot}).
+snapshots_refreshed = Signal()
@@ -0,0 +1,79 @@
+"""
+Latest-quote snapshots (StockSnapshot) refreshed set-based after ingest.
+"""
+from django.db import transaction
+from django.db.models import Count, Max
+from django.dispatch import receiver
+from django.utils import timezone
+
+from stock_scraper.indicators import latest_volatility, optional_float
+from stock_scraper.models import StockSnapshot
+from stock_scraper.signals import ohlc_written, snapshots_refreshed
+from stock_scraper.universe import load_ohlc_matrix
+
+# Bars used for the volatility shown on /stocks/
+VOLATILITY_LOOKBACK = 30
+
+
+@transaction.atomic
+def refresh_snapshots(symbols=None):
+    """
+    Recompute snapshots for the given symbols (every symbol by default)
+    from their latest bars in one query. Returns the number of snapshots written.
+    """
+    names, dates, values = load_ohlc_matrix(
+        symbols, fields=('close', 'volume'), lookback=VOLATILITY_LOOKBACK
+    )
+    closes = values['close']
+    volatility = latest_volatility(closes, VOLATILITY_LOOKBACK) if names else []
+    now = timezone.now()
+
+    snapshots = [
+        StockSnapshot(
+            symbol=symbol,
+            date=dates[i, -1].item(),
+            close=float(closes[i, -1]),
+            previous_close=optional_float(closes[i, -2]) if closes.shape[1] > 1 else None,
+            volume=int(values['volume'][i, -1]),
+            volatility=optional_float(volatility[i]),
+            updated_at=now,
+        )
+        for i, symbol in enumerate(names)
+    ]
+
+    # Symbols that no longer have any bars lose their snapshot
+    stale = StockSnapshot.objects.exclude(symbol__in=names)
+    if symbols is not None:
+        stale = stale.filter(symbol__in=list(symbols))
+    removed = list(stale.values_list('symbol', flat=True))
+    stale.delete()
+
+    StockSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['symbol'],
+        update_fields=['date', 'close', 'previous_close', 'volume', 'volatility', 'updated_at'],
+    )
+
+    # Read the stored versions back: auto_now stamps its own time on save
+    versions = dict.fromkeys(removed if symbols is None else list(symbols))
+    versions.update(
+        (symbol, updated_at.isoformat())
+        for symbol, updated_at in StockSnapshot.objects.filter(symbol__in=names).values_list('symbol', 'updated_at')
+    )
+    snapshots_refreshed.send(sender=refresh_snapshots, versions=versions)
+    return len(snapshots)
+
+
+@receiver(ohlc_written)
+def refresh_ingested_snapshots(sender, symbols, **kwargs):
+    refresh_snapshots(symbols)
+
+
+def universe_version():
+    """
+    Token that changes whenever any symbol is ingested, for cache keys
+    """
+    state = StockSnapshot.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    updated = state['updated'].isoformat() if state['updated'] else ''
+    return f"{state['count']}-{updated}"
@@ -0,0 +1,98 @@
+"""
+Loop-free trading signals built on top of stock_scraper.indicators.
+
+Signals are int8 arrays of 1 (buy), -1 (sell) and 0 (neutral) with the same
+shape as the indicator arrays they come from, so 1-D (one symbol) and 2-D
+(symbols x days) inputs both work.
+"""
+import numpy as np
+
+
+# Moving average pairs used by the MA crossover strategy view
+MA_CROSSOVER_STRATEGIES = {
+    'golden_cross': {
+        'name': 'Golden Cross (50/200 MA)',
+        'type': 'Long-term Trend',
+        'short_ma': 'MA50',
+        'long_ma': 'MA200'
+    },
+    'ema_short': {
+        'name': 'Short-term EMA (9/21)',
+        'type': 'Short-term Trend',
+        'short_ma': 'EMA9',
+        'long_ma': 'EMA21'
+    },
+    'ema_medium': {
+        'name': 'Medium-term EMA (20/50)',
+        'type': 'Medium-term Trend',
+        'short_ma': 'EMA20',
+        'long_ma': 'EMA50'
+    }
+}
+
+# Bars needed before the golden cross momentum strategy emits signals
+GOLDEN_CROSS_START = 200
+
+
+def _previous(values):
+    """
+    Shift values one bar to the right along the last axis, padding with NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shifted = np.full_like(values, np.nan)
+    shifted[..., 1:] = values[..., :-1]
+    return shifted
+
+
+def crosses_above(short, long):
+    """
+    True where `short` moves from at or below `long` to above it
+    """
+    short = np.asarray(short, dtype=np.float64)
+    long = np.asarray(long, dtype=np.float64)
+    return (_previous(short) <= _previous(long)) & (short > long)
+
+
+def crosses_below(short, long):
+    """
+    True where `short` moves from at or above `long` to below it
+    """
+    short = np.asarray(short, dtype=np.float64)
+    long = np.asarray(long, dtype=np.float64)
+    return (_previous(short) >= _previous(long)) & (short < long)
+
+
+def crossover_signals(short, long):
+    """
+    Buy when the short average crosses above the long one, sell when it
+    crosses below, neutral otherwise
+    """
+    signal = np.zeros(np.shape(short), dtype=np.int8)
+    signal[crosses_above(short, long)] = 1
+    signal[crosses_below(short, long)] = -1
+    return signal
+
+
+def golden_cross_momentum_signals(ma50, ma200, rsi, start=GOLDEN_CROSS_START):
+    """
+    Buy on a golden cross confirmed by RSI momentum above 50, sell while
+    MA50 is below MA200. Bars before `start` are left neutral; for 2-D input
+    `start` may also be one index per row.
+    """
+    ma50 = np.asarray(ma50, dtype=np.float64)
+    ma200 = np.asarray(ma200, dtype=np.float64)
+    rsi = np.asarray(rsi, dtype=np.float64)
+
+    buy = crosses_above(ma50, ma200) & (rsi > 50)
+    sell = ~buy & (ma50 < ma200)
+
+    signal = np.zeros(ma50.shape, dtype=np.int8)
+    signal[buy] = 1
+    signal[sell] = -1
+    start = np.asarray(start)
+    columns = np.arange(signal.shape[-1])
+    if start.ndim == 0:
+        signal[..., columns < start] = 0
+    else:
+        signal[columns < start[:, np.newaxis]] = 0
+    return signal
@@ -1,3 +1,359 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from backend.pagination import _after, _encode
+from stock_scraper.indicator_table import INDICATOR_FIELDS, rebuild_symbol_indicators
+from stock_scraper.ingest import replace_symbol_ohlc
+from stock_scraper.models import Investment, StockIndicator, StockOHLC
+from stock_scraper.ohlc_cache import load_symbols_ohlc, ohlc_cache
+from stock_scraper.portfolio import portfolio_summary
+from stock_scraper.snapshots import refresh_snapshots
+from stock_scraper.signals import ohlc_written
+from stock_scraper.strategies import MA_CROSSOVER_STRATEGIES
+
+SYMBOL = 'testsym'
+# Signals and positions must match exactly; running indicator sums may
+# differ from a rebuild in the last bits
+EXACT_FIELDS = ['date', 'close', 'signal', 'position', *[f'{key}_signal' for key in MA_CROSSOVER_STRATEGIES]]
+FLOAT_FIELDS = list(INDICATOR_FIELDS.values())
+
+
+def trend_closes():
+    # A long decline then a recovery, so MA50 crosses above MA200 with RSI above 50
+    rng = np.random.default_rng(7)
+    trend = np.concatenate([np.linspace(200, 100, 260), np.linspace(100, 220, 160)])
+    return np.round(trend * np.exp(rng.normal(0, 0.01, len(trend))), 2)
+
+
+class IncrementalIndicatorTests(TestCase):
+    def setUp(self):
+        store = tempfile.TemporaryDirectory()
+        self.addCleanup(store.cleanup)
+        settings = override_settings(STOCK_COLUMNAR_STORE_DIR=store.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.closes = trend_closes()
+
+    def ingest(self, start, stop, replaced):
+        first = date(2020, 1, 1)
+        StockOHLC.objects.bulk_create(
+            StockOHLC(symbol=SYMBOL, date=first + timedelta(days=i), open=close, high=close,
+                      low=close, close=close, volume=1000, percent=0.0)
+            for i, close in enumerate(self.closes[start:stop], start)
+        )
+        ohlc_written.send(sender=self.__class__, symbols=[SYMBOL], replaced=replaced)
+
+    def clear(self):
+        StockOHLC.objects.filter(symbol=SYMBOL).delete()
+        ohlc_written.send(sender=self.__class__, symbols=[SYMBOL], replaced=True)
+
+    def stored(self, fields):
+        return list(StockIndicator.objects.filter(symbol=SYMBOL).order_by('date').values_list(*fields))
+
+    def test_split_ingest_matches_rebuild(self):
+        self.ingest(0, len(self.closes), replaced=True)
+        rebuild_symbol_indicators(SYMBOL)
+        expected = self.stored(EXACT_FIELDS)
+        expected_floats = np.array(self.stored(FLOAT_FIELDS), dtype=np.float64)
+        self.clear()
+        buys = [i for i, row in enumerate(expected) if row[EXACT_FIELDS.index('signal')] == 1]
+        self.assertTrue(buys, 'fixture should produce a golden cross momentum buy')
+
+        # Split right after the buy bar and a little either side of it
+        for split in sorted({buys[0] - 1, buys[0], buys[0] + 1, buys[0] + 2}):
+            with self.subTest(split=split):
+                self.ingest(0, split, replaced=True)
+                self.ingest(split, len(self.closes), replaced=False)
+                try:
+                    self.assertEqual(self.stored(EXACT_FIELDS), expected)
+                    np.testing.assert_allclose(
+                        np.array(self.stored(FLOAT_FIELDS), dtype=np.float64), expected_floats, rtol=1e-9
+                    )
+                finally:
+                    self.clear()
+
+
+class ReplaceUploadTests(TestCase):
+    def setUp(self):
+        self.bars = {
+            day: StockOHLC.objects.create(symbol=SYMBOL, date=date(2024, 1, day), open=10, high=10, low=10,
+                                          close=10, volume=100, percent=0.0)
+            for day in (2, 3, 4)
+        }
+        user = User.objects.create_user('holder')
+        # Held on a date the new file keeps and on one it drops
+        self.kept = Investment.objects.create(user=user, stock=self.bars[2], buy_price=10, buy_date=date(2024, 1, 2))
+        self.dropped = Investment.objects.create(user=user, stock=self.bars[3], buy_price=10, buy_date=date(2024, 1, 3))
+
+    def test_replace_keeps_investments(self):
+        csv_file = io.BytesIO(
+            b"Date,Open,High,Low,Close,Volume\n"
+            b"01/02/2024,11,12,10,11.5,200\n"
+            b"01/05/2024,12,13,11,12.5,300\n"
+        )
+        result = replace_symbol_ohlc(SYMBOL, csv_file)
+
+        self.assertEqual(result['records_created'], 2)
+        self.assertEqual(result['deleted_count'], 2)
+        self.assertEqual(
+            list(StockOHLC.objects.filter(symbol=SYMBOL).order_by('date').values_list('date', 'close')),
+            [(date(2024, 1, 2), 11.5), (date(2024, 1, 5), 12.5)],
+        )
+        self.assertEqual(Investment.objects.count(), 2)
+        self.kept.refresh_from_db()
+        self.dropped.refresh_from_db()
+        self.assertEqual(self.kept.stock_id, self.bars[2].id)
+        self.assertEqual(self.dropped.stock.date, date(2024, 1, 5))
+
+    def test_failed_replace_changes_nothing(self):
+        result = replace_symbol_ohlc(SYMBOL, io.BytesIO(b"Date,Open,High,Low,Close,Volume\nbad,x,x,x,x,x\n"))
+
+        self.assertEqual((result['records_created'], result['deleted_count']), (0, 0))
+        self.assertEqual(StockOHLC.objects.filter(symbol=SYMBOL).count(), 3)
+        self.assertEqual(Investment.objects.count(), 2)
+
+
+class OHLCCacheTests(TestCase):
+    def setUp(self):
+        store = tempfile.TemporaryDirectory()
+        self.addCleanup(store.cleanup)
+        settings = override_settings(STOCK_COLUMNAR_STORE_DIR=store.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        closes = trend_closes()
+        self.symbols = [f'{SYMBOL}{i}' for i in range(3)]
+        StockOHLC.objects.bulk_create(
+            StockOHLC(symbol=symbol, date=date(2020, 1, 1) + timedelta(days=i), open=close, high=close,
+                      low=close, close=close, volume=1000, percent=0.0)
+            for symbol in self.symbols
+            for i, close in enumerate(closes)
+        )
+        ohlc_written.send(sender=self.__class__, symbols=self.symbols, replaced=True)
+        ohlc_cache.invalidate()
+
+    def test_second_universe_load_hits(self):
+        # A budget far below one symbol's arrays: store-backed entries must still stay
+        max_bytes, ohlc_cache.max_bytes = ohlc_cache.max_bytes, 1
+        self.addCleanup(setattr, ohlc_cache, 'max_bytes', max_bytes)
+
+        first = load_symbols_ohlc()
+        before = ohlc_cache.stats()
+        second = load_symbols_ohlc()
+        after = ohlc_cache.stats()
+
+        self.assertEqual(list(first), self.symbols)
+        self.assertEqual(after['hits'] - before['hits'], len(self.symbols))
+        self.assertEqual(after['misses'], before['misses'])
+        for symbol in self.symbols:
+            np.testing.assert_array_equal(second[symbol]['close'], first[symbol]['close'])
+
+
+class InvestmentBatchTests(TestCase):
+    def setUp(self):
+        self.bar = StockOHLC.objects.create(symbol=SYMBOL, date=date(2024, 1, 2), open=10, high=10, low=10,
+                                            close=10, volume=100, percent=0.0)
+        self.user = User.objects.create_user('investor')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_import_reports_every_invalid_row_and_writes_nothing(self):
+        response = self.client.post('/stock_scraper/investments/import/', [
+            {'stock': SYMBOL, 'buy_price': 10, 'quantity': 1, 'buy_date': '2024-01-02'},
+            {'stock': 'nope', 'buy_price': -1, 'quantity': 2.5, 'buy_date': '02/01/2024'},
+            {'stock': SYMBOL, 'buy_price': 10, 'quantity': 1, 'buy_date': '2024-01-02', 'sell_date': '2023-01-01'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [
+            'Row 2: unknown stock',
+            'Row 2: buy price must be greater than 0',
+            'Row 2: quantity must be a positive whole number',
+            'Row 2: invalid buy date format, use YYYY-MM-DD',
+            'Row 3: sell date is before buy date',
+        ])
+        self.assertFalse(Investment.objects.exists())
+
+    def test_import_csv(self):
+        csv_file = io.BytesIO(
+            f"Symbol,Price,Qty,Date,Sell Price,Sell Date\n{SYMBOL.upper()},10,3,2024-01-02,12,2024-02-01\n".encode()
+        )
+        csv_file.name = 'broker.csv'
+        response = self.client.post('/stock_scraper/investments/import/', {'csv_file': csv_file}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        investment = Investment.objects.get(user=self.user)
+        self.assertEqual((investment.stock_id, investment.quantity, investment.total_pl), (self.bar.id, 3, 6.0))
+
+    def test_empty_csv_is_rejected(self):
+        csv_file = io.BytesIO(b'')
+        csv_file.name = 'empty.csv'
+        response = self.client.post('/stock_scraper/investments/import/', {'csv_file': csv_file}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['No records to process'])
+
+    def test_close_rolls_back_when_any_row_is_invalid(self):
+        open_lot = Investment.objects.create(user=self.user, stock=self.bar, buy_price=10, quantity=2,
+                                             buy_date=date(2024, 1, 2))
+        response = self.client.patch('/stock_scraper/investments/batch/', [
+            {'id': open_lot.id, 'sell_price': 15, 'sell_date': '2024-03-01'},
+            {'id': open_lot.id + 100, 'sell_price': 15},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['Row 2: investment not found'])
+        open_lot.refresh_from_db()
+        self.assertIsNone(open_lot.sell_price)
+
+        response = self.client.patch('/stock_scraper/investments/batch/', [
+            {'id': open_lot.id, 'sell_price': 15, 'sell_date': '2024-03-01'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        open_lot.refresh_from_db()
+        self.assertEqual((open_lot.sell_price, open_lot.total_pl), (15.0, 10.0))
+
+    def test_close_rejects_sold_lots(self):
+        sold = Investment.objects.create(user=self.user, stock=self.bar, buy_price=10, buy_date=date(2024, 1, 2),
+                                         sell_price=12, sell_date=date(2024, 2, 1), total_pl=2)
+        dated_only = Investment.objects.create(user=self.user, stock=self.bar, buy_price=10,
+                                               buy_date=date(2024, 1, 2), sell_date=date(2024, 2, 1))
+        response = self.client.patch('/stock_scraper/investments/batch/', [
+            {'id': sold.id, 'sell_price': 1},
+            {'id': dated_only.id, 'sell_price': 11},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['Row 1: investment already sold'])
+        sold.refresh_from_db()
+        self.assertEqual(sold.sell_price, 12.0)
+
+        # A lot with only a sell date can still be completed
+        response = self.client.patch('/stock_scraper/investments/batch/', [
+            {'id': dated_only.id, 'sell_price': 11},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        dated_only.refresh_from_db()
+        self.assertEqual(dated_only.total_pl, 1.0)
+
+
+class PortfolioSummaryTests(TestCase):
+    def setUp(self):
+        store = tempfile.TemporaryDirectory()
+        self.addCleanup(store.cleanup)
+        settings = override_settings(STOCK_COLUMNAR_STORE_DIR=store.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        bars = [
+            StockOHLC.objects.create(symbol=SYMBOL, date=date(2024, 1, day), open=close, high=close, low=close,
+                                     close=close, volume=100, percent=0.0)
+            for day, close in ((2, 10), (3, 12))
+        ]
+        refresh_snapshots([SYMBOL])
+        # No snapshot, so no close to mark its lots at
+        unpriced = StockOHLC.objects.create(symbol='unpriced', date=date(2024, 1, 2), open=5, high=5, low=5,
+                                            close=5, volume=100, percent=0.0)
+        self.user = User.objects.create_user('holder')
+        lot = dict(user=self.user, buy_date=date(2024, 1, 2))
+        Investment.objects.create(stock=bars[0], buy_price=10, quantity=2, **lot)
+        Investment.objects.create(stock=bars[0], buy_price=10, quantity=1, sell_price=15,
+                                  sell_date=date(2024, 1, 3), **lot)
+        Investment.objects.create(stock=bars[0], buy_price=11, quantity=1, sell_date=date(2024, 1, 3), **lot)
+        Investment.objects.create(stock=unpriced, buy_price=5, quantity=4, **lot)
+
+    def test_summary(self):
+        summary = portfolio_summary(self.user)
+
+        self.assertEqual(summary['positions'], [
+            {
+                'symbol': SYMBOL, 'open_quantity': 3, 'sold_quantity': 1, 'average_cost': 31 / 3,
+                'cost_basis': 31.0, 'last_close': 12.0, 'last_date': '2024-01-03', 'market_value': 36.0,
+                'unrealized_pl': 5.0, 'unrealized_pl_percent': 5 / 31 * 100, 'realized_pl': 5.0,
+                'weight': 100.0,
+            },
+            {
+                'symbol': 'unpriced', 'open_quantity': 4, 'sold_quantity': 0, 'average_cost': 5.0,
+                'cost_basis': 20.0, 'last_close': None, 'last_date': None, 'market_value': None,
+                'unrealized_pl': None, 'unrealized_pl_percent': None, 'realized_pl': 0.0, 'weight': None,
+            },
+        ])
+        self.assertEqual(summary['totals'], {
+            'cost_basis': 51.0,
+            'market_value': 36.0,
+            'unrealized_pl': 5.0,
+            'unrealized_pl_percent': 5 / 31 * 100,
+            'realized_pl': 5.0,
+            'total_pl': 10.0,
+            'unpriced_symbols': 1,
+            'incomplete_lots': 1,
+        })
+
+
+class KeysetPaginationTests(TestCase):
+    ORDERING = ['-buy_date', '-id']
+
+    def setUp(self):
+        bar = StockOHLC.objects.create(symbol=SYMBOL, date=date(2024, 1, 1), open=10, high=10, low=10,
+                                       close=10, volume=100, percent=0.0)
+        self.user = User.objects.create_user('pager')
+        # Ties on buy_date, so pages must fall back to the id
+        Investment.objects.bulk_create(
+            Investment(user=self.user, stock=bar, buy_price=10, buy_date=date(2024, 1, day))
+            for day in (1, 1, 1, 2, 2, 3, 3)
+        )
+        self.expected = list(Investment.objects.order_by(*self.ORDERING).values_list('id', flat=True))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_after_descending_fields(self):
+        rows = list(Investment.objects.order_by(*self.ORDERING).values_list('buy_date', 'id'))
+        for position, values in enumerate(rows):
+            with self.subTest(values=values):
+                after = Investment.objects.filter(_after(self.ORDERING, list(values))).order_by(*self.ORDERING)
+                self.assertEqual(list(after.values_list('id', flat=True)), self.expected[position + 1:])
+
+    def test_pages_cover_every_row_once(self):
+        url = '/stock_scraper/investments/?page_size=3&count=true'
+        seen, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            pages.append((len(page['results']), page['page_size'], page['count']))
+            seen.extend(row['id'] for row in page['results'])
+            url = page['next']
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, [(3, 3, 7), (3, 3, 7), (1, 3, 7)])
+
+    def test_exact_last_page_has_no_next(self):
+        response = self.client.get('/stock_scraper/investments/?page_size=7')
+        self.assertIsNone(response.json()['next'])
+        self.assertNotIn('count', response.json())
+
+    def test_bad_cursor_is_rejected(self):
+        def b64(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        for cursor in ('not-a-cursor!', b64({'buy_date': '2024-01-01'}), b64(['2024-01-01']),
+                       b64(['yesterday', 1]), _encode(['2024-01-02', 'x'])):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/stock_scraper/investments/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+    def test_bad_page_size_is_rejected(self):
+        for page_size in ('0', '-1', 'ten'):
+            with self.subTest(page_size=page_size):
+                response = self.client.get('/stock_scraper/investments/', {'page_size': page_size})
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,75 @@
+"""
+Load many symbols' OHLC history at once as 2-D (symbols x bars) arrays.
+
+Rows are right-aligned on each symbol's latest bar and left-padded with NaN
+(NaT for dates), which is the layout stock_scraper.indicators expects.
+"""
+import numpy as np
+import pandas as pd
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from stock_scraper.models import StockOHLC
+from stock_scraper.ohlc_cache import load_symbols_ohlc
+
+
+def stack_ohlc(series, fields=('close',)):
+    """
+    Stack {symbol: arrays} (as returned by ohlc_cache.load_symbols_ohlc)
+    into right-aligned (symbols x bars) matrices.
+
+    Returns (symbols, dates, values) like load_ohlc_matrix.
+    """
+    names = list(series)
+    width = max((len(series[symbol]['date']) for symbol in names), default=0)
+    dates = np.full((len(names), width), np.datetime64('NaT'), dtype='datetime64[D]')
+    values = {field: np.full((len(names), width), np.nan) for field in fields}
+    for i, symbol in enumerate(names):
+        arrays = series[symbol]
+        bars = len(arrays['date'])
+        dates[i, width - bars:] = arrays['date']
+        for field in fields:
+            values[field][i, width - bars:] = arrays[field]
+    return names, dates, values
+
+
+def load_ohlc_matrix(symbols=None, fields=('close',), lookback=None):
+    """
+    Load OHLC fields for every symbol (or the given ones), optionally only
+    each symbol's latest `lookback` bars.
+
+    Full histories come from the in-process OHLC cache; a lookback is pushed
+    down to the database as one windowed query.
+
+    Returns (symbols, dates, values): a list of symbols, a datetime64[D]
+    array shaped (symbols x bars) and a dict of float arrays of the same
+    shape keyed by field.
+    """
+    fields = list(fields)
+    if lookback is None:
+        return stack_ohlc(load_symbols_ohlc(symbols), fields)
+
+    queryset = StockOHLC.objects.all()
+    if symbols is not None:
+        queryset = queryset.filter(symbol__in=list(symbols))
+    queryset = queryset.annotate(
+        bar=Window(RowNumber(), partition_by=[F('symbol')], order_by=F('date').desc())
+    ).filter(bar__lte=lookback)
+    frame = pd.DataFrame.from_records(
+        queryset.order_by('symbol', 'date').values_list('symbol', 'date', *fields),
+        columns=['symbol', 'date', *fields],
+    )
+    series = {}
+    for symbol, rows in frame.groupby('symbol', sort=True):
+        series[str(symbol)] = {'date': pd.to_datetime(rows['date']).to_numpy().astype('datetime64[D]')}
+        for field in fields:
+            series[str(symbol)][field] = rows[field].to_numpy(dtype=np.float64)
+    return stack_ohlc(series, fields)
+
+
+def load_close_matrix(symbols=None, lookback=None):
+    """
+    Closes for every symbol (or the given ones) as (symbols, dates, closes)
+    """
+    names, dates, values = load_ohlc_matrix(symbols, ('close',), lookback)
+    return names, dates, values['close']
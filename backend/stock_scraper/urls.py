@@ -6,7 +6,15 @@ urlpatterns = [
     path('strategy/<str:symbol>/', views.golden_cross_momentum, name='golden_cross_momentum'),
     path('ma_crossover/<str:symbol>/', views.ma_crossover_strategy, name='ma_crossover_strategy'),
     path('stocks/', views.get_stocks_data, name='get_stocks_data'),
+    path('export/', views.export_ohlc, name='export_ohlc'),
+    path('screener/', views.get_screener, name='get_screener'),
+    path('risk/', views.get_risk_metrics, name='get_risk_metrics'),
+    path('backtest/', views.get_backtest, name='get_backtest'),
+    path('backtest/sweep/', views.get_crossover_sweep, name='get_crossover_sweep'),
     path('investments/', views.get_investments, name='get_investments'),
+    path('investments/portfolio/', views.get_portfolio, name='get_portfolio'),
     path('investments/add/', views.add_investment, name='add_investment'),
+    path('investments/import/', views.import_investments_batch, name='import_investments_batch'),
+    path('investments/batch/', views.update_investments_batch, name='update_investments_batch'),
     path('investments/<int:investment_id>/', views.update_investment, name='update_investment'),
 ]
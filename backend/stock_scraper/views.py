@@ -1,124 +1,109 @@
 # views.py
-from django.http import JsonResponse
-from stock_scraper.models import StockOHLC, Investment
-import pandas as pd
-import numpy as np
+from django.http import JsonResponse, StreamingHttpResponse
+from stock_scraper.models import StockOHLC, StockSnapshot, Investment
 from django.shortcuts import render
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Max
 from datetime import datetime
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-
+from backend.pagination import InvalidPage, paginate_keyset
+from stock_scraper.backtest import cached_backtest, cached_sweep, nearest_cost_bps
+from stock_scraper.backtest_engine import (
+    BACKTEST_STRATEGIES, SWEEP_LONG_WINDOWS, SWEEP_METRICS, SWEEP_SHORT_WINDOWS
+)
+from stock_scraper.http_cache import (
+    universe_etag, universe_etag_for, universe_last_modified, symbol_etag_for, symbol_last_modified
+)
+from stock_scraper.export import (
+    EXPORT_FORMATS, export_negotiation, export_rows, iter_export, negotiate_export_format
+)
+from stock_scraper.indicator_table import load_symbol_indicators
+from stock_scraper.investment_batch import BatchValidationError, close_investments, import_investments
+from stock_scraper.portfolio import portfolio_summary
+from stock_scraper.renderers import negotiate_format, render_frame
+from stock_scraper.risk import VOLATILITY_WINDOWS, cached_risk_metrics
+from stock_scraper.screener import cached_screen_universe
+from stock_scraper.snapshots import refresh_snapshots
+from stock_scraper.strategies import MA_CROSSOVER_STRATEGIES
+
+# Limits on the window grid a sweep request may ask for (the default grid
+# is 8 x 8 windows up to 250)
+MAX_SWEEP_WINDOWS = 8
+MAX_SWEEP_WINDOW = 250
+
+# Page sizes for the symbol list (one short row per symbol)
+SYMBOLS_PAGE_SIZE = 1000
+MAX_SYMBOLS_PAGE_SIZE = 5000
+
+@condition(etag_func=universe_etag, last_modified_func=universe_last_modified)
 def get_stock_symbols(request):
-    # Get unique symbols from StockOHLC
-    symbols = StockOHLC.objects.values_list('symbol', flat=True).distinct().order_by('symbol')
-    return JsonResponse({"symbols": list(symbols)}, safe=False)
-
-def calculate_rsi(prices, period=14):
-    """
-    Calculate Relative Strength Index (RSI)
-    """
-    deltas = np.diff(prices)
-    seed = deltas[:period+1]
-    up = seed[seed >= 0].sum()/period
-    down = -seed[seed < 0].sum()/period
-    rs = up/down
-    rsi = np.zeros_like(prices)
-    rsi[:period] = 100. - 100./(1. + rs)
-
-    for i in range(period, len(prices)):
-        delta = deltas[i - 1]
-        if delta > 0:
-            upval = delta
-            downval = 0.
-        else:
-            upval = 0.
-            downval = -delta
-
-        up = (up * (period - 1) + upval) / period
-        down = (down * (period - 1) + downval) / period
-        rs = up/down
-        rsi[i] = 100. - 100./(1. + rs)
-
-    return rsi
-
-def calculate_ma(prices, window):
-    """
-    Calculate Moving Average manually
-    """
-    ma = np.zeros_like(prices)
-    for i in range(len(prices)):
-        if i < window - 1:
-            ma[i] = np.nan
-        else:
-            ma[i] = np.mean(prices[i-window+1:i+1])
-    return ma
-
-def calculate_ema(prices, window):
+    # One snapshot per symbol, so paging walks the unique symbol index
+    snapshots = StockSnapshot.objects.all()
+    if not snapshots.exists() and StockOHLC.objects.exists():
+        refresh_snapshots()
+    try:
+        rows, page = paginate_keyset(
+            snapshots, request, ['symbol'], SYMBOLS_PAGE_SIZE, MAX_SYMBOLS_PAGE_SIZE, values=['symbol']
+        )
+    except InvalidPage as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"symbols": [row['symbol'] for row in rows], **page}, safe=False)
+
+def parse_date_range(request, default_limit):
     """
-    Calculate Exponential Moving Average
+    Read optional start/end (YYYY-MM-DD) and limit query parameters.
+    Without start or limit, the latest `default_limit` rows are returned.
     """
-    ema = np.zeros_like(prices)
-    multiplier = 2 / (window + 1)
-    
-    # Initialize EMA with SMA
-    ema[window-1] = np.mean(prices[:window])
-    
-    # Calculate EMA
-    for i in range(window, len(prices)):
-        ema[i] = (prices[i] - ema[i-1]) * multiplier + ema[i-1]
-    
-    return ema
-
-
+    start = request.GET.get('start')
+    end = request.GET.get('end')
+    limit = request.GET.get('limit')
+    try:
+        start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    except ValueError:
+        raise ValueError('Invalid date format. Please use YYYY-MM-DD')
+    if limit:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError('Invalid limit')
+        if limit <= 0:
+            raise ValueError('Limit must be greater than 0')
+    else:
+        limit = None if start else default_limit
+    if start and end and start > end:
+        raise ValueError('start must not be after end')
+    return start, end, limit
+
+@condition(etag_func=symbol_etag_for(negotiate_format), last_modified_func=symbol_last_modified)
 def golden_cross_momentum(request, symbol):
-    # Step 1: Query stock data from the database for the given symbol
-    ohlc_queryset = StockOHLC.objects.filter(symbol=symbol).order_by('date')
-
-    # Step 2: Convert queryset to DataFrame
-    if not ohlc_queryset.exists():
+    try:
+        start, end, limit = parse_date_range(request, default_limit=200)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # Step 1: Read the materialized indicators for the given symbol
+    # By default keep the last 200 days with every indicator available for better visualization
+    df = load_symbol_indicators(
+        symbol,
+        columns=['close', 'ma50', 'ma200', 'rsi', 'signal', 'position'],
+        required=['ma50', 'ma200', 'rsi', 'position'],
+        limit=limit,
+        start=start,
+        end=end,
+    )
+    if df is None:
         return JsonResponse({"error": "No data found for the given symbol."}, status=404)
 
-    df = pd.DataFrame.from_records(
-        ohlc_queryset.values('date', 'close')
-    )
-    df['date'] = pd.to_datetime(df['date'])
-    df.set_index('date', inplace=True)
-
-    # Step 3: Calculate indicators
-    close_prices = df['close'].values
-    df['MA50'] = calculate_ma(close_prices, 50)
-    df['MA200'] = calculate_ma(close_prices, 200)
-    df['RSI'] = calculate_rsi(close_prices)
-
-    # Step 4: Generate signals
-    df['Signal'] = 0
-    
-    # Generate signals based on Golden Cross and RSI
-    for i in range(200, len(df)):
-        # Check for Golden Cross (MA50 crosses above MA200)
-        golden_cross = (df['MA50'].iloc[i-1] <= df['MA200'].iloc[i-1]) and (df['MA50'].iloc[i] > df['MA200'].iloc[i])
-        
-        # Check RSI momentum
-        rsi_momentum = df['RSI'].iloc[i] > 50
-        
-        # Generate signal
-        if golden_cross and rsi_momentum:
-            df['Signal'].iloc[i] = 1  # Buy signal
-        elif df['MA50'].iloc[i] < df['MA200'].iloc[i]:
-            df['Signal'].iloc[i] = -1  # Sell signal
-
-    df['Position'] = df['Signal'].diff()
-
-    # Step 5: Prepare result - return last 200 days of data for better visualization
-    # Include RSI in the visualization data
-    result = df.dropna().tail(200)[['close', 'MA50', 'MA200', 'RSI', 'Signal', 'Position']].reset_index()
-    
-    # Format the data for visualization
-    data = result.to_dict(orient='records')
-    
+    # Step 2: Prepare result - include RSI in the visualization data
+    result = df.rename(columns={
+        'ma50': 'MA50', 'ma200': 'MA200', 'rsi': 'RSI', 'signal': 'Signal', 'position': 'Position'
+    }).reset_index()
+
     # Add metadata about the indicators
     metadata = {
         "indicators": {
@@ -142,190 +127,166 @@ def golden_cross_momentum(request, symbol):
         }
     }
 
-    return JsonResponse({
-        "data": data,
-        "metadata": metadata
-    }, safe=False)
+    # Format the data for visualization in the negotiated layout
+    return render_frame(request, result, metadata)
 
+@condition(etag_func=symbol_etag_for(negotiate_format), last_modified_func=symbol_last_modified)
 def ma_crossover_strategy(request, symbol):
-    # Step 1: Query stock data from the database for the given symbol
-    # Get at least 500 days of data to ensure we have enough for MA calculations
-    ohlc_queryset = StockOHLC.objects.filter(symbol=symbol).order_by('date')
+    try:
+        start, end, limit = parse_date_range(request, default_limit=300)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    # Step 2: Convert queryset to DataFrame
-    if not ohlc_queryset.exists():
+    # Step 1: Read the materialized indicators and signals for the given symbol
+    # For Golden Cross (200 MA), we need at least 200 days of data
+    # For other strategies, we'll return 300 days by default to ensure enough signals
+    strategies = MA_CROSSOVER_STRATEGIES
+    indicator_columns = ['ma50', 'ma200', 'ema9', 'ema21', 'ema20', 'ema50']
+    signal_columns = [f'{strategy_key}_signal' for strategy_key in strategies]
+    df = load_symbol_indicators(
+        symbol,
+        columns=['close', *indicator_columns, *signal_columns],
+        required=indicator_columns,
+        limit=limit,
+        start=start,
+        end=end,
+    )
+    if df is None:
         return JsonResponse({"error": "No data found for the given symbol."}, status=404)
 
-    df = pd.DataFrame.from_records(
-        ohlc_queryset.values('date', 'close')
-    )
-    df['date'] = pd.to_datetime(df['date'])
-    df.set_index('date', inplace=True)
-
-    # Step 3: Calculate all MAs and EMAs
-    close_prices = df['close'].values
-    
-    # Simple Moving Averages
-    df['MA50'] = calculate_ma(close_prices, 50)
-    df['MA200'] = calculate_ma(close_prices, 200)
-    
-    # Exponential Moving Averages
-    df['EMA9'] = calculate_ema(close_prices, 9)
-    df['EMA21'] = calculate_ema(close_prices, 21)
-    df['EMA20'] = calculate_ema(close_prices, 20)
-    df['EMA50'] = calculate_ema(close_prices, 50)
-
-    # Step 4: Generate signals for each strategy
-    strategies = {
-        'golden_cross': {
-            'name': 'Golden Cross (50/200 MA)',
-            'type': 'Long-term Trend',
-            'short_ma': 'MA50',
-            'long_ma': 'MA200'
-        },
-        'ema_short': {
-            'name': 'Short-term EMA (9/21)',
-            'type': 'Short-term Trend',
-            'short_ma': 'EMA9',
-            'long_ma': 'EMA21'
-        },
-        'ema_medium': {
-            'name': 'Medium-term EMA (20/50)',
-            'type': 'Medium-term Trend',
-            'short_ma': 'EMA20',
-            'long_ma': 'EMA50'
-        }
-    }
+    # Step 2: Prepare result
+    result = df.rename(columns={column: column.upper() for column in indicator_columns}).reset_index()
 
-    # Generate signals for each strategy
-    for strategy_key, strategy in strategies.items():
-        df[f'{strategy_key}_signal'] = 0
-        short_ma = strategy['short_ma']
-        long_ma = strategy['long_ma']
-        for i in range(1, len(df)):
-            if pd.notna(df[short_ma].iloc[i]) and pd.notna(df[long_ma].iloc[i]):
-                prev_short = df[short_ma].iloc[i-1]
-                prev_long = df[long_ma].iloc[i-1]
-                curr_short = df[short_ma].iloc[i]
-                curr_long = df[long_ma].iloc[i]
-                # Buy: short MA crosses above long MA from below
-                if prev_short <= prev_long and curr_short > curr_long:
-                    df[f'{strategy_key}_signal'].iloc[i] = 1
-                # Sell: short MA crosses below long MA from above
-                elif prev_short >= prev_long and curr_short < curr_long:
-                    df[f'{strategy_key}_signal'].iloc[i] = -1
-                # Neutral: both MAs are parallel (equal)
-                elif curr_short == curr_long:
-                    df[f'{strategy_key}_signal'].iloc[i] = 0
-
-    # Step 5: Prepare result - return more historical data for better signal analysis
-    # For Golden Cross (200 MA), we need at least 200 days of data
-    # For other strategies, we'll return 300 days to ensure enough signals
-    result = df.dropna().tail(300).reset_index()
-    
-    # Format the data for visualization
-    data = result.to_dict(orient='records')
-    
     # Add metadata about the strategies
     metadata = {
         "strategies": strategies
     }
 
+    # Format the data for visualization in the negotiated layout
+    return render_frame(request, result, metadata)
+
+@condition(etag_func=universe_etag, last_modified_func=universe_last_modified)
+def get_screener(request):
+    # Latest RSI, volatility and strategy signals for every symbol in one pass
+    stocks = cached_screen_universe()
+    return JsonResponse({
+        'stocks': stocks,
+        'count': len(stocks)
+    })
+
+@condition(etag_func=universe_etag, last_modified_func=universe_last_modified)
+def get_risk_metrics(request):
+    # Multi-window volatility, max drawdown and downside deviation for every symbol
+    metrics = cached_risk_metrics()
     return JsonResponse({
-        "data": data,
-        "metadata": metadata
-    }, safe=False)
+        'windows': list(VOLATILITY_WINDOWS),
+        'metrics': metrics,
+        'count': len(metrics)
+    })
+
+def computing_response(what):
+    # The report is being built on the job worker; keep this answer out of
+    # caches so the client's retry is not revalidated into a 304
+    response = Response(
+        {'status': 'computing', 'message': f'{what} is being computed. Retry shortly.'},
+        status=status.HTTP_202_ACCEPTED,
+    )
+    response['Retry-After'] = '5'
+    add_never_cache_headers(response)
+    return response
 
-def calculate_volatility(symbol, current_date, lookback_days=30):
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=universe_etag, last_modified_func=universe_last_modified)
+def get_backtest(request):
+    # Backtest results per strategy and symbol; ?strategy=key[,key]&cost_bps=10
+    requested = [key for key in request.GET.get('strategy', '').split(',') if key]
+    unknown = [key for key in requested if key not in BACKTEST_STRATEGIES]
+    if unknown:
+        return Response({
+            "error": f"Unknown strategy: {', '.join(unknown)}. Use one of: {', '.join(BACKTEST_STRATEGIES)}."
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        cost_bps = float(request.GET.get('cost_bps', 0))
+        if not 0 <= cost_bps < 10000:
+            raise ValueError
+    except ValueError:
+        return Response({"error": "cost_bps must be a number between 0 and 10000."}, status=status.HTTP_400_BAD_REQUEST)
+
+    cost_bps = nearest_cost_bps(cost_bps)
+    report = cached_backtest(requested or None, cost_bps, background=True)
+    if report is None:
+        return computing_response('Backtest')
+    return Response({
+        'strategies': report,
+        'cost_bps': cost_bps
+    })
+
+def parse_windows(value, default):
     """
-    Calculate volatility using standard deviation of returns
+    Comma-separated window lengths from a query parameter
     """
+    if not value:
+        return list(default)
     try:
-        # Get historical data for the lookback period
-        historical_data = StockOHLC.objects.filter(
-            symbol=symbol,
-            date__lte=current_date
-        ).order_by('-date')[:lookback_days]
-        
-        if len(historical_data) < 2:
-            return None
-            
-        # Convert to list and reverse to get chronological order
-        prices = [float(data.close) for data in historical_data]
-        prices.reverse()
-        
-        # Calculate daily returns using log returns
-        returns = []
-        for i in range(1, len(prices)):
-            if prices[i-1] > 0:  # Avoid division by zero
-                log_return = np.log(prices[i] / prices[i-1])
-                returns.append(log_return)
-        
-        if not returns:
-            return None
-            
-        # Calculate standard deviation of returns
-        returns_array = np.array(returns)
-        volatility = np.std(returns_array, ddof=1)  # ddof=1 for sample standard deviation
-        
-        # Annualize the volatility (multiply by sqrt of trading days)
-        annualized_volatility = volatility * np.sqrt(252)
-        
-        # Convert to percentage
-        volatility_percentage = annualized_volatility * 100
-        
-        return volatility_percentage
-    except Exception as e:
-        print(f"Error calculating volatility for {symbol}: {str(e)}")
-        return None
+        windows = sorted({int(window) for window in value.split(',') if window.strip()})
+    except ValueError:
+        raise ValueError('Windows must be comma-separated whole numbers')
+    if not windows or len(windows) > MAX_SWEEP_WINDOWS or windows[0] < 2 or windows[-1] > MAX_SWEEP_WINDOW:
+        raise ValueError(
+            f"Give 1 to {MAX_SWEEP_WINDOWS} windows between 2 and {MAX_SWEEP_WINDOW}."
+        )
+    return windows
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=universe_etag, last_modified_func=universe_last_modified)
+def get_crossover_sweep(request):
+    # Crossover performance for a grid of window pairs; ?kind=ma|ema&short=5,10&long=50,200&metric=&cost_bps=
+    kind = request.GET.get('kind', 'ma')
+    metric = request.GET.get('metric', 'total_return')
+    if kind not in ('ma', 'ema'):
+        return Response({"error": "kind must be 'ma' or 'ema'."}, status=status.HTTP_400_BAD_REQUEST)
+    if metric not in SWEEP_METRICS:
+        return Response(
+            {"error": f"metric must be one of: {', '.join(SWEEP_METRICS)}."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        short_windows = parse_windows(request.GET.get('short'), SWEEP_SHORT_WINDOWS)
+        long_windows = parse_windows(request.GET.get('long'), SWEEP_LONG_WINDOWS)
+        cost_bps = float(request.GET.get('cost_bps', 0))
+        if not 0 <= cost_bps < 10000:
+            raise ValueError("cost_bps must be between 0 and 10000.")
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    report = cached_sweep(short_windows, long_windows, kind, metric, nearest_cost_bps(cost_bps), background=True)
+    if report is None:
+        return computing_response('Crossover sweep')
+    return Response(report)
+
+@condition(etag_func=universe_etag, last_modified_func=universe_last_modified)
 def get_stocks_data(request):
     try:
-        print("Starting get_stocks_data function")  # Debug log
-        
-        # Get the latest date for each symbol from StockOHLC
-        latest_dates = StockOHLC.objects.values('symbol').annotate(
-            latest_date=Max('date')
-        ).values_list('symbol', 'latest_date')
-        
-        # Get the latest OHLC data for each symbol using a more precise query
-        latest_stocks = []
-        for symbol, latest_date in latest_dates:
-            stock = StockOHLC.objects.filter(
-                symbol=symbol,
-                date=latest_date
-            ).first()
-            if stock:
-                latest_stocks.append(stock)
-        
-        print(f"Found {len(latest_stocks)} stocks")  # Debug log
-        
-        stocks_data = []
-        for stock in latest_stocks:
-            try:
-                # Get the previous day's data for calculating change
-                previous_day = StockOHLC.objects.filter(
-                    symbol=stock.symbol,
-                    date__lt=stock.date
-                ).order_by('-date').first()
-                
-                # Calculate volatility
-                volatility = calculate_volatility(stock.symbol, stock.date)
-                
-                stock_data = {
-                    'symbol': stock.symbol,
-                    'close': float(stock.close) if stock.close else None,
-                    'previous_close': float(previous_day.close) if previous_day else None,
-                    'volume': stock.volume,
-                    'volatility': volatility,
-                    'date': stock.date.strftime('%Y-%m-%d') if stock.date else None
-                }
-                stocks_data.append(stock_data)
-            except Exception as e:
-                print(f"Error processing stock {stock.symbol}: {str(e)}")  # Debug log
-                continue
-        
-        print(f"Successfully processed {len(stocks_data)} stocks")  # Debug log
+        # Latest quote per symbol, maintained by refresh_snapshots at ingest
+        snapshots = StockSnapshot.objects.order_by('symbol')
+        if not snapshots.exists() and StockOHLC.objects.exists():
+            refresh_snapshots()
+
+        stocks_data = [
+            {
+                'symbol': symbol,
+                'close': close,
+                'previous_close': previous_close,
+                'volume': volume,
+                'volatility': volatility,
+                'date': date.strftime('%Y-%m-%d')
+            }
+            for symbol, close, previous_close, volume, volatility, date in snapshots.values_list(
+                'symbol', 'close', 'previous_close', 'volume', 'volatility', 'date'
+            )
+        ]
+
         return JsonResponse({
             'stocks': stocks_data,
             'count': len(stocks_data)
@@ -336,29 +297,72 @@ def get_stocks_data(request):
         print(f"Traceback: {traceback.format_exc()}")  # Debug log
         return JsonResponse({'error': str(e)}, status=500)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@export_negotiation
+@vary_on_headers('Accept')
+@condition(etag_func=universe_etag_for(negotiate_export_format), last_modified_func=universe_last_modified)
+def export_ohlc(request):
+    # Stream stored bars as NDJSON (default) or CSV; ?symbol=a,b&start=&end=&format=csv
+    export_format = negotiate_export_format(request)
+    if export_format is None:
+        return JsonResponse({"error": f"Unknown format. Use one of: {', '.join(EXPORT_FORMATS)}."}, status=400)
+    try:
+        start, end, _ = parse_date_range(request, default_limit=None)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    symbols = [symbol for symbol in request.GET.get('symbol', '').split(',') if symbol]
+
+    response = StreamingHttpResponse(
+        iter_export(export_format, export_rows(symbols, start, end)),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="ohlc.{export_format}"'
+    return response
+
+def investment_data(investment):
+    return {
+        'id': investment.id,
+        'stock': {
+            'symbol': investment.stock.symbol,
+        },
+        'buy_price': investment.buy_price,
+        'quantity': investment.quantity,
+        'buy_date': investment.buy_date.strftime('%Y-%m-%d') if investment.buy_date else None,
+        'sell_price': investment.sell_price,
+        'sell_date': investment.sell_date.strftime('%Y-%m-%d') if investment.sell_date else None,
+        'total_pl': investment.total_pl
+    }
+
+def batch_records(request):
+    # A CSV upload (csv_file) or a JSON list, bare or as {"investments": [...]}
+    if 'csv_file' in request.FILES:
+        return request.FILES['csv_file']
+    if isinstance(request.data, dict):
+        return request.data.get('investments')
+    return request.data
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_investments(request):
     try:
-        investments = Investment.objects.filter(user=request.user).select_related('stock')
-        investments_data = []
-        
-        for investment in investments:
-            investment_data = {
-                'id': investment.id,
-                'stock': {
-                    'symbol': investment.stock.symbol,
-                },
-                'buy_price': investment.buy_price,
-                'quantity': investment.quantity,
-                'buy_date': investment.buy_date.strftime('%Y-%m-%d') if investment.buy_date else None,
-                'sell_price': investment.sell_price,
-                'sell_date': investment.sell_date.strftime('%Y-%m-%d') if investment.sell_date else None,
-                'total_pl': investment.total_pl
-            }
-            investments_data.append(investment_data)
-        
-        return Response(investments_data)
+        investments, page = paginate_keyset(
+            Investment.objects.filter(user=request.user).select_related('stock'),
+            request, ['-buy_date', '-id'],
+        )
+        investments_data = [investment_data(investment) for investment in investments]
+        return Response({'results': investments_data, **page})
+    except InvalidPage as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_portfolio(request):
+    # Open positions marked to the latest close, plus realized P&L, per symbol and in total
+    try:
+        return Response(portfolio_summary(request.user))
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -462,6 +466,36 @@ def add_investment(request):
         print(f"Traceback: {traceback.format_exc()}")
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_investments_batch(request):
+    # Create many investments at once; nothing is written unless every record is valid
+    try:
+        investments = import_investments(request.user, batch_records(request))
+    except BatchValidationError as e:
+        return Response({'error': str(e), 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response({
+        'created': len(investments),
+        'investments': [investment_data(investment) for investment in investments],
+    }, status=status.HTTP_201_CREATED)
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def update_investments_batch(request):
+    # Sell (close) many investments at once; nothing is written unless every record is valid
+    try:
+        investments = close_investments(request.user, batch_records(request))
+    except BatchValidationError as e:
+        return Response({'error': str(e), 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response({
+        'updated': len(investments),
+        'investments': [investment_data(investment) for investment in investments],
+    })
+
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def update_investment(request, investment_id):
@@ -496,18 +530,7 @@ def update_investment(request, investment_id):
         investment.calculate_pl()
         investment.save()
         
-        return Response({
-            'id': investment.id,
-            'stock': {
-                'symbol': investment.stock.symbol,
-            },
-            'buy_price': investment.buy_price,
-            'quantity': investment.quantity,
-            'buy_date': investment.buy_date.strftime('%Y-%m-%d') if investment.buy_date else None,
-            'sell_price': investment.sell_price,
-            'sell_date': investment.sell_date.strftime('%Y-%m-%d') if investment.sell_date else None,
-            'total_pl': investment.total_pl
-        })
+        return Response(investment_data(investment))
     except Investment.DoesNotExist:
         return Response({'error': 'Investment not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
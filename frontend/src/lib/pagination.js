@@ -0,0 +1,13 @@
+import API from "@/lib/axios";
+
+// Follow `next` cursors of a keyset-paginated list and return every row
+export async function fetchAllPages(path, key = "results", params = {}) {
+    const rows = [];
+    let response = await API.get(path, { params });
+    rows.push(...response.data[key]);
+    while (response.data.next) {
+        response = await API.get(response.data.next);
+        rows.push(...response.data[key]);
+    }
+    return rows;
+}
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import API from "@/lib/axios";
+import { fetchAllPages } from "@/lib/pagination";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -41,8 +42,8 @@ const AdminDashboard = () => {
 
     const fetchUsers = async () => {
         try {
-            const response = await API.get("/api/admin/users/");
-            setUsers(response.data);
+            const users = await fetchAllPages("/api/admin/users/");
+            setUsers(users);
             setLoading(false);
         } catch (error) {
             console.error("Error fetching users:", error);
@@ -104,16 +105,31 @@ const AdminDashboard = () => {
         formData.append("stock_title", stockTitle);
         formData.append("csv_file", csvFile);
 
-        setSeedingStatus("Seeding stocks...");
+        setSeedingStatus("Uploading CSV...");
         try {
             const response = await API.post("/api/admin/seed-stocks/", formData, {
                 headers: {
                     "Content-Type": "multipart/form-data",
                 },
             });
-            setSeedingStatus(`Success: ${response.data.message}`);
             setStockTitle("");
             setCsvFile(null);
+
+            // The upload is imported in the background; poll the job until it finishes
+            const jobId = response.data.job_id;
+            let job = response.data;
+            while (job.status === "queued" || job.status === "running") {
+                setSeedingStatus(
+                    job.status === "running"
+                        ? `Seeding stocks... ${job.rows_processed || 0} rows processed`
+                        : "Waiting for the ingest worker..."
+                );
+                await new Promise((resolve) => setTimeout(resolve, 1000));
+                job = (await API.get(`/api/admin/seed-stocks/jobs/${jobId}/`)).data;
+            }
+            setSeedingStatus(
+                job.status === "succeeded" ? `Success: ${job.message}` : `Error: ${job.message}`
+            );
         } catch (error) {
             console.error("Error seeding stocks:", error);
             setSeedingStatus(`Error: ${error.response?.data?.error || "Unknown error"}`);
@@ -20,36 +20,19 @@ export default function BuySellNeutral() {
       setLoading(true);
       setError(null);
       try {
-        // Fetch all symbols
-        const symbolsResp = await API.get('/stock_scraper/symbols/');
-        const symbols = symbolsResp.data.symbols || [];
-        // Fetch volatility data
-        const stocksResp = await API.get('/stock_scraper/stocks/');
-        const stocksData = stocksResp.data.stocks || [];
-        // For each symbol, fetch Golden Cross Momentum/RSI and MA crossover signals
-        const allRows = await Promise.all(symbols.map(async (symbol) => {
-          try {
-            // Golden Cross Momentum & RSI
-            const gcmResp = await API.get(`/stock_scraper/strategy/${symbol}/`);
-            const gcmData = gcmResp.data && gcmResp.data.data && gcmResp.data.data.length > 0 ? gcmResp.data.data[gcmResp.data.data.length - 1] : null;
-            // Short/Mid Term from MA crossover
-            const maResp = await API.get(`/stock_scraper/ma_crossover/${symbol}/`);
-            const maData = maResp.data && maResp.data.data && maResp.data.data.length > 0 ? maResp.data.data[maResp.data.data.length - 1] : null;
-            // Volatility
-            const stockInfo = stocksData.find(s => s.symbol.toLowerCase() === symbol.toLowerCase());
-            return {
-              stock: symbol,
-              rsi: gcmData && gcmData.RSI ? gcmData.RSI.toFixed(2) : '-',
-              volatility: stockInfo?.volatility ? stockInfo.volatility.toFixed(2) : '-',
-              goldenCross: gcmData && gcmData.Signal === 1 ? 'Buy' : gcmData && gcmData.Signal === -1 ? 'Sell' : 'Neutral',
-              shortTerm: maData && maData.ema_short_signal === 1 ? 'Buy' : maData && maData.ema_short_signal === -1 ? 'Sell' : 'Neutral',
-              midTerm: maData && maData.ema_medium_signal === 1 ? 'Buy' : maData && maData.ema_medium_signal === -1 ? 'Sell' : 'Neutral',
-            };
-          } catch (e) {
-            return null;
-          }
+        // Latest RSI, volatility and signals for every symbol in one request
+        const resp = await API.get('/stock_scraper/screener/');
+        const stocks = resp.data.stocks || [];
+        const toLabel = (signal) => signal === 1 ? 'Buy' : signal === -1 ? 'Sell' : 'Neutral';
+        const allRows = stocks.map((stock) => ({
+          stock: stock.symbol,
+          rsi: stock.rsi != null ? stock.rsi.toFixed(2) : '-',
+          volatility: stock.volatility ? stock.volatility.toFixed(2) : '-',
+          goldenCross: toLabel(stock.golden_cross_signal),
+          shortTerm: toLabel(stock.ema_short_signal),
+          midTerm: toLabel(stock.ema_medium_signal),
         }));
-        setRows(allRows.filter(row => row));
+        setRows(allRows);
       } catch (e) {
         setError('Failed to fetch data.');
       } finally {
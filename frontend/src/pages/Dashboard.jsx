@@ -27,6 +27,7 @@ import {
 } from "chart.js";
 import { Scatter } from "react-chartjs-2";
 import API from "@/lib/axios";
+import { fetchAllPages } from "@/lib/pagination";
 import "chartjs-adapter-date-fns";
 
 ChartJS.register(
@@ -49,7 +50,7 @@ function RealizedPLChart() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const { data: investments } = await API.get("/stock_scraper/investments/");
+        const investments = await fetchAllPages("/stock_scraper/investments/");
         const buyData = [];
         const sellData = [];
         let totalProfitLoss = 0;
@@ -149,46 +150,30 @@ export default function Dashboard() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        // Fetch investments
-        const { data: investments } = await API.get("/stock_scraper/investments/");
-        // Fetch latest stock prices
-        const { data: stocksResp } = await API.get("/stock_scraper/stocks/");
-        const stocksLatest = stocksResp.stocks;
-
-        // Group unsold investments by symbol
-        const grouped = {};
-        investments.forEach(inv => {
-          const symbol = inv.stock.symbol;
-          // Only consider unsold investments
-          if (!inv.sell_price && !inv.sell_date) {
-            if (!grouped[symbol]) grouped[symbol] = [];
-            grouped[symbol].push(inv);
-          }
-        });
+        // Open positions marked to the latest close by the backend
+        const { data: portfolio } = await API.get("/stock_scraper/investments/portfolio/");
 
         // Build card data for unsold stocks only
-        const cards = Object.entries(grouped).map(([symbol, invs]) => {
-          const totalShares = invs.reduce((sum, inv) => sum + inv.quantity, 0);
-          const totalCost = invs.reduce((sum, inv) => sum + inv.buy_price * inv.quantity, 0);
-          const avgBuyPrice = totalCost / totalShares;
-          const latest = stocksLatest.find(s => s.symbol === symbol);
-          const currentPrice = latest ? latest.close : null;
-          let gain = 0, percent = 0, color = "";
-          if (currentPrice !== null) {
-            gain = (currentPrice - avgBuyPrice) * totalShares;
-            percent = ((currentPrice - avgBuyPrice) / avgBuyPrice) * 100;
-            color = gain >= 0 ? "text-green-500" : "text-red-500";
-          }
-          return {
-            symbol,
-            totalShares,
-            avgBuyPrice,
-            currentPrice,
-            gain,
-            percent,
-            color,
-          };
-        });
+        const cards = portfolio.positions
+          .filter(position => position.open_quantity > 0)
+          .map(position => {
+            const currentPrice = position.last_close;
+            let gain = 0, percent = 0, color = "";
+            if (currentPrice !== null) {
+              gain = position.unrealized_pl;
+              percent = position.unrealized_pl_percent;
+              color = gain >= 0 ? "text-green-500" : "text-red-500";
+            }
+            return {
+              symbol: position.symbol,
+              totalShares: position.open_quantity,
+              avgBuyPrice: position.average_cost,
+              currentPrice,
+              gain,
+              percent,
+              color,
+            };
+          });
         setInvestmentCards(cards);
       } catch (e) {
         setInvestmentCards([]);
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import API from "@/lib/axios";
+import { fetchAllPages } from "@/lib/pagination";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -27,10 +28,8 @@ const MyStocks = () => {
 
   const fetchInvestments = async () => {
     try {
-      const response = await API.get('/stock_scraper/investments/');
-      if (response.data) {
-        setInvestments(response.data);
-      }
+      const investments = await fetchAllPages('/stock_scraper/investments/');
+      setInvestments(investments);
       setLoading(false);
     } catch (err) {
       console.error('Error fetching investments:', err);
@@ -43,10 +42,8 @@ const MyStocks = () => {
 
   const fetchSymbols = async () => {
     try {
-      const response = await API.get('/stock_scraper/symbols/');
-      if (response.data && response.data.symbols) {
-        setSymbols(response.data.symbols);
-      }
+      const symbols = await fetchAllPages('/stock_scraper/symbols/', 'symbols');
+      setSymbols(symbols);
     } catch (err) {
       console.error('Error fetching symbols:', err);
       if (err.response?.status === 401) {
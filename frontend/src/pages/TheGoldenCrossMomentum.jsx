@@ -11,6 +11,7 @@ import {
 } from 'chart.js';
 import { Line } from 'react-chartjs-2';
 import API from "@/lib/axios";
+import { fetchAllPages } from "@/lib/pagination";
 
 // Register ChartJS components
 ChartJS.register(
@@ -35,14 +36,11 @@ const TheGoldenCrossMomentum = () => {
   useEffect(() => {
     async function getSymbols() {
       try {
-        const response = await API.get('/stock_scraper/symbols/');
-        if (response.data && response.data.symbols) {
-          // Sort symbols alphabetically
-          const sortedSymbols = [...response.data.symbols].sort();
-          setSymbols(sortedSymbols);
-          if (sortedSymbols.length > 0) {
-            setSelectedSymbol(sortedSymbols[0]);
-          }
+        // Symbols come back in alphabetical order
+        const sortedSymbols = await fetchAllPages('/stock_scraper/symbols/', 'symbols');
+        setSymbols(sortedSymbols);
+        if (sortedSymbols.length > 0) {
+          setSelectedSymbol(sortedSymbols[0]);
         }
       } catch (error) {
         console.error("Error fetching symbols:", error);